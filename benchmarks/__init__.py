@@ -0,0 +1 @@
+"""Benchmarki i symulator bramki Modbus TCP dla integracji EnsolarX."""
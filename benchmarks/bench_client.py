@@ -0,0 +1,137 @@
+"""Benchmark przepustowości klienta Modbus TCP: koszt CPU na 1000 rejestrów.
+
+Porównuje dawną ścieżkę odbioru (``StreamReader`` z dwoma ``readexactly`` na ramkę,
+sklejanie MBAP + PDU, ``list(struct.unpack(...))`` i dekoder pakujący listę) z
+``ModbusTcpClient`` na ``BufferedProtocol`` (bufor odbiorczy, parsowanie w miejscu,
+``array('H')``). Symulator bramki działa w osobnym procesie, więc mierzony czas
+procesora (``time.process_time``) to wyłącznie koszt klienta i dekodowania.
+
+Uruchomienie (z katalogu głównego repozytorium, w środowisku z Home Assistant):
+
+    python -m benchmarks.bench_client [--requests 5000] [--count 125]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import struct
+import time
+from typing import Dict, List, Tuple
+
+from custom_components.ensolarx.decoder import BlockDecoder
+from custom_components.ensolarx.modbus_client import ModbusTcpClient
+
+from .simulator import EnsolarXSimulator, SimulatorConfig
+
+
+class _LegacyStreamClient:
+    """Dawna ścieżka odczytu FC 3 (bez wyłącznika i ponownych połączeń)."""
+
+    def __init__(self, host: str, port: int, unit_id: int, timeout: float = 3.0) -> None:
+        self._host, self._port, self._unit, self._timeout = host, port, unit_id, timeout
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._tid = 0
+        self._reader = self._writer = None
+        self._task: asyncio.Task | None = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        self._task = asyncio.get_running_loop().create_task(self._read_loop())
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+        if self._writer:
+            self._writer.close()
+
+    async def _read_loop(self) -> None:
+        while True:
+            hdr = await self._reader.readexactly(7)
+            tid, _, length, _ = struct.unpack(">HHHB", hdr)
+            data = await self._reader.readexactly(length - 1)
+            fut = self._pending.pop(tid, None)
+            if fut is not None and not fut.done():
+                fut.set_result(data)
+
+    async def read_holding_registers(self, address: int, count: int) -> List[int]:
+        self._tid = (self._tid + 1) & 0xFFFF
+        tid = self._tid
+        fut = asyncio.get_running_loop().create_future()
+        self._pending[tid] = fut
+        pdu = struct.pack(">BHH", 3, address, count)
+        mbap = struct.pack(">HHHB", tid, 0, len(pdu) + 1, self._unit)
+        self._writer.write(mbap + pdu)
+        await self._writer.drain()
+        data = await asyncio.wait_for(fut, timeout=self._timeout)
+        byte_count = data[1]
+        return list(struct.unpack(f">{byte_count//2}H", data[2:2+byte_count]))
+
+
+def _serve(port_queue, stop_event, in_flight: int) -> None:
+    async def run() -> None:
+        registers = {a: (a * 37) & 0xFFFF for a in range(0, 1000)}
+        sim = EnsolarXSimulator(SimulatorConfig(serial=in_flight == 1), registers=registers)
+        await sim.start()
+        port_queue.put(sim.port)
+        while not stop_event.is_set():
+            await asyncio.sleep(0.05)
+        await sim.stop()
+
+    asyncio.run(run())
+
+
+async def _measure(client, requests: int, count: int, in_flight: int, decoder: BlockDecoder) -> Tuple[float, float]:
+    """Zwraca (µs CPU na 1000 rejestrów, rejestry/s)."""
+    await client.connect()
+    sem = asyncio.Semaphore(in_flight)
+
+    async def one(i: int) -> None:
+        async with sem:
+            decoder.decode(await client.read_holding_registers((i % 4) * count, count))
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(min(200, requests))))  # rozgrzewka
+        cpu = time.process_time()
+        wall = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        cpu = time.process_time() - cpu
+        wall = time.perf_counter() - wall
+    finally:
+        await client.close()
+    total = requests * count
+    return cpu / total * 1000 * 1e6, total / wall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--count", type=int, default=125, help="rejestrów na zapytanie (1-125)")
+    args = parser.parse_args()
+
+    count = max(1, min(125, args.count))
+    decoder = BlockDecoder(
+        [{"name": f"r{i}", "address": i, "data_type": "uint16"} for i in range(count)], 0, count
+    )
+    print(f"{'wariant':<34} {'µs CPU / 1000 rej.':>18} {'rejestry/s':>12}")
+    for in_flight in (1, 8):
+        ctx = multiprocessing.get_context("spawn")
+        port_queue, stop_event = ctx.Queue(), ctx.Event()
+        server = ctx.Process(target=_serve, args=(port_queue, stop_event, in_flight), daemon=True)
+        server.start()
+        try:
+            port = port_queue.get(timeout=30)
+            variants = [
+                ("stream + list (dawniej)", _LegacyStreamClient("127.0.0.1", port, 18)),
+                ("BufferedProtocol + array", ModbusTcpClient("127.0.0.1", port, 18, max_in_flight=in_flight)),
+            ]
+            for label, client in variants:
+                cost, rate = asyncio.run(_measure(client, args.requests, count, in_flight, decoder))
+                print(f"{label + f', w locie {in_flight}':<34} {cost:18.1f} {rate:12.0f}")
+        finally:
+            stop_event.set()
+            server.join(5)
+
+
+if __name__ == "__main__":
+    main()
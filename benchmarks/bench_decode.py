@@ -0,0 +1,100 @@
+"""Micro-benchmark dekodowania pełnej mapy rejestrów EnsolarX.
+
+Porównuje dawną ścieżkę (słownik definicji przeglądany dla każdego sensora w każdym
+cyklu) ze skompilowanymi dekoderami bloków. Wynik: pełne cykle dekodowania na sekundę.
+
+Uruchomienie (z katalogu głównego repozytorium, w środowisku z Home Assistant):
+
+    python -m benchmarks.bench_decode [--seconds 2]
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import struct
+import time
+from typing import Any, Callable, Dict, List
+
+from custom_components.ensolarx.decoder import BlockDecoder
+from custom_components.ensolarx.planner import plan_reads
+from custom_components.ensolarx.profiles import bundled_profile
+
+
+def _legacy_decode(regs: List[int], dtype: str, word_swap: bool) -> Any:
+    if dtype == "uint16":
+        return int(regs[0] & 0xFFFF)
+    if dtype == "int16":
+        val = regs[0]
+        if val & 0x8000:
+            val -= 0x10000
+        return int(val)
+    hi, lo = regs[0], regs[1]
+    if word_swap:
+        hi, lo = lo, hi
+    raw = (hi << 16) | lo
+    if dtype == "uint32":
+        return int(raw & 0xFFFFFFFF)
+    return struct.unpack(">f", raw.to_bytes(4, "big"))[0]
+
+
+def _legacy_cycle(blocks, block_regs) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for block, regs in zip(blocks, block_regs):
+        for d in block.defs:
+            dtype = d.get("dtype") or d.get("data_type", "uint16")
+            scale = float(d.get("scale", 1.0))
+            precision = d.get("precision")
+            word_swap = bool(d.get("word_swap", False))
+            count = 1 if dtype in ("uint16", "int16") else 2
+            off = d["address"] - block.start
+            value = _legacy_decode(regs[off:off + count], dtype, word_swap)
+            if scale != 1.0:
+                value = value * scale
+            if precision is not None and isinstance(value, (int, float)):
+                value = round(value, int(precision))
+            results[d["name"]] = value
+    return results
+
+
+def _compiled_cycle(plan, block_regs) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+    for (_, decoder), regs in zip(plan, block_regs):
+        results.update(zip(decoder.names, decoder.decode(regs)))
+    return results
+
+
+def _rate(fn: Callable[[], Any], seconds: float) -> float:
+    n = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            fn()
+        n += 100
+    return n / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=2.0, help="czas pomiaru na wariant")
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    defs = bundled_profile().defs()
+    blocks = plan_reads(defs)
+    plan = [(b, BlockDecoder(b.defs, b.start, b.count)) for b in blocks]
+    block_regs = [[rnd.randrange(0x10000) for _ in range(b.count)] for b in blocks]
+
+    legacy = _legacy_cycle(blocks, block_regs)
+    compiled = _compiled_cycle(plan, block_regs)
+    assert legacy == compiled, "dekodery dają różne wyniki"
+
+    print(f"{len(defs)} definicji w {len(blocks)} blokach")
+    legacy_rate = _rate(lambda: _legacy_cycle(blocks, block_regs), args.seconds)
+    compiled_rate = _rate(lambda: _compiled_cycle(plan, block_regs), args.seconds)
+    print(f"legacy:   {legacy_rate:10.0f} cykli/s")
+    print(f"compiled: {compiled_rate:10.0f} cykli/s  (x{compiled_rate / legacy_rate:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Benchmark end-to-end: odświeżanie koordynatora EnsolarX na symulatorze Modbus TCP.
+
+Mierzy liczbę zapytań na cykl, opóźnienie cyklu (p50/p99) i bajty przesłane w obu
+kierunkach. Uruchomienie z katalogu głównego repozytorium (w środowisku z Home Assistant):
+
+    python -m benchmarks.bench_polling --latency 0.02 --cycles 50
+    python -m benchmarks.bench_polling --matrix      # porównanie typowych ustawień
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Dict, List
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.ensolarx.const import DEFAULT_MAX_BLOCK_SIZE, DEFAULT_MAX_GAP
+from custom_components.ensolarx.coordinator import EnsolarXCoordinator
+from custom_components.ensolarx.modbus_client import ModbusTcpClient, ModbusUnitClient
+
+from .simulator import EnsolarXSimulator, SimulatorConfig
+
+
+@dataclass
+class BenchResult:
+    label: str
+    cycles: int
+    failed_cycles: int
+    requests_per_cycle: float
+    bytes_per_cycle: float
+    p50_ms: float
+    p99_ms: float
+    values: int
+
+    def row(self) -> str:
+        return (
+            f"{self.label:<28} {self.requests_per_cycle:8.1f} {self.bytes_per_cycle:10.0f} "
+            f"{self.p50_ms:9.1f} {self.p99_ms:9.1f} {self.failed_cycles:7d} {self.values:7d}"
+        )
+
+
+HEADER = f"{'scenariusz':<28} {'zap/cykl':>8} {'bajty/cykl':>10} {'p50 [ms]':>9} {'p99 [ms]':>9} {'błędy':>7} {'wartości':>7}"
+
+
+def _percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[idx]
+
+
+async def run_benchmark(
+    sim_config: SimulatorConfig,
+    cycles: int = 20,
+    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE,
+    max_gap: int = DEFAULT_MAX_GAP,
+    max_in_flight: int = 1,
+    timeout: float = 1.0,
+    all_tiers: bool = True,
+    units: int = 1,
+    label: str = "",
+) -> BenchResult:
+    """Wykonaj ``cycles`` odświeżeń koordynatora na świeżym symulatorze.
+
+    ``units > 1``: tyle falowników (kolejne unit ID) za jedną bramką, każdy z własnym
+    koordynatorem, na jednym współdzielonym gnieździe; cykl to odświeżenie wszystkich.
+    """
+    unit_ids = [sim_config.unit_id + i for i in range(units)]
+    sim_config = replace(sim_config, extra_units=sim_config.extra_units | set(unit_ids[1:]))
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        async with EnsolarXSimulator(sim_config) as sim:
+            client = ModbusTcpClient(
+                "127.0.0.1", sim.port, unit_id=sim_config.unit_id,
+                timeout=timeout, max_in_flight=max_in_flight,
+            )
+            coordinators = [
+                EnsolarXCoordinator(
+                    hass, ModbusUnitClient(client, unit), scan_interval_s=10,
+                    max_block_size=max_block_size, max_gap=max_gap,
+                )
+                for unit in unit_ids
+            ]
+            durations: List[float] = []
+            failed = 0
+            data: Dict[str, Any] = {}
+            try:
+                for _ in range(cycles):
+                    if all_tiers:
+                        for coordinator in coordinators:
+                            coordinator.reset_tier_schedule()
+                    sim.tick()
+                    start = time.perf_counter()
+                    await asyncio.gather(*(c.async_refresh() for c in coordinators))
+                    durations.append(time.perf_counter() - start)
+                    if not all(c.last_update_success for c in coordinators):
+                        failed += 1
+                    data = {
+                        f"{c.client.unit_id}:{k}": v
+                        for c in coordinators for k, v in (c.data or {}).items()
+                    } or data
+            finally:
+                await client.close()
+
+            return BenchResult(
+                label=label or f"in_flight={max_in_flight} block={max_block_size}",
+                cycles=cycles,
+                failed_cycles=failed,
+                requests_per_cycle=sim.requests / cycles,
+                bytes_per_cycle=(sim.bytes_rx + sim.bytes_tx) / cycles,
+                p50_ms=statistics.median(durations) * 1000,
+                p99_ms=_percentile(durations, 99) * 1000,
+                values=len(data),
+            )
+
+
+async def _matrix(args: argparse.Namespace) -> None:
+    base = dict(latency=args.latency, jitter=args.jitter)
+    scenarios = [
+        ("pojedyncze rejestry", SimulatorConfig(**base), dict(max_block_size=1, max_gap=0)),
+        ("bloki, tryb ścisły", SimulatorConfig(**base), dict()),
+        ("bloki, potokowanie x4", SimulatorConfig(serial=False, **base), dict(max_in_flight=4)),
+        ("bloki, 5% zgubionych", SimulatorConfig(drop_rate=0.05, **base), dict()),
+        ("bloki, 5% wyjątków", SimulatorConfig(exception_rate=0.05, **base), dict()),
+        ("bloki, 2% zerwań", SimulatorConfig(reset_rate=0.02, **base), dict()),
+        ("3 falowniki, wspólne gniazdo", SimulatorConfig(**base), dict(units=3)),
+    ]
+    print(HEADER)
+    for label, cfg, kwargs in scenarios:
+        result = await run_benchmark(cfg, cycles=args.cycles, timeout=args.timeout, label=label, **kwargs)
+        print(result.row())
+
+
+async def _single(args: argparse.Namespace) -> None:
+    cfg = SimulatorConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        drop_rate=args.drop_rate,
+        exception_rate=args.exception_rate,
+        reset_rate=args.reset_rate,
+        serial=not args.pipelined_server,
+        strict_map=args.strict_map,
+    )
+    result = await run_benchmark(
+        cfg,
+        cycles=args.cycles,
+        max_block_size=args.max_block_size,
+        max_gap=args.max_gap,
+        max_in_flight=args.max_in_flight,
+        timeout=args.timeout,
+        all_tiers=not args.tiered,
+        units=args.units,
+    )
+    print(HEADER)
+    print(result.row())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.01, help="opóźnienie na zapytanie [s]")
+    parser.add_argument("--jitter", type=float, default=0.0, help="losowy dodatek do opóźnienia [s]")
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--exception-rate", type=float, default=0.0)
+    parser.add_argument("--reset-rate", type=float, default=0.0)
+    parser.add_argument("--strict-map", action="store_true", help="adresy spoza mapy zwracają wyjątek")
+    parser.add_argument("--pipelined-server", action="store_true", help="symulator obsługuje zapytania równolegle")
+    parser.add_argument("--max-block-size", type=int, default=DEFAULT_MAX_BLOCK_SIZE)
+    parser.add_argument("--max-gap", type=int, default=DEFAULT_MAX_GAP)
+    parser.add_argument("--max-in-flight", type=int, default=1)
+    parser.add_argument("--units", type=int, default=1, help="liczba falowników (unit ID) za bramką")
+    parser.add_argument("--timeout", type=float, default=1.0, help="timeout klienta [s]")
+    parser.add_argument("--tiered", action="store_true", help="klasy odpytywania jak w HA (domyślnie pełna mapa co cykl)")
+    parser.add_argument("--matrix", action="store_true", help="porównanie typowych scenariuszy")
+    args = parser.parse_args()
+    asyncio.run(_matrix(args) if args.matrix else _single(args))
+
+
+if __name__ == "__main__":
+    main()
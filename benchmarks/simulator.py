@@ -0,0 +1,222 @@
+"""Lokalny symulator bramki Modbus TCP z mapą rejestrów EnsolarX.
+
+Obsługuje FC 3/4 (odczyt holding/input) i FC 6/16 (zapis holding) z konfigurowalnym opóźnieniem, jitterem,
+gubieniem ramek, odpowiedziami wyjątkiem i zrywaniem połączenia. Zlicza zapytania
+i bajty w obu kierunkach, więc nadaje się do porównywania strategii odpytywania
+bez sprzętu.
+
+    sim = EnsolarXSimulator(SimulatorConfig(latency=0.02))
+    await sim.start()
+    ... ModbusTcpClient("127.0.0.1", sim.port, unit_id=sim.config.unit_id) ...
+    await sim.stop()
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import struct
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Set
+
+from custom_components.ensolarx.profiles import bundled_profile
+
+EXC_ILLEGAL_FUNCTION = 1
+EXC_ILLEGAL_ADDRESS = 2
+EXC_DEVICE_FAILURE = 4
+
+
+@dataclass
+class SimulatorConfig:
+    unit_id: int = 18
+    # dodatkowe unit ID za tą samą bramką (odpowiadają tą samą mapą rejestrów)
+    extra_units: Set[int] = field(default_factory=set)
+    latency: float = 0.0  # s na zapytanie (czas „magistrali RTU”)
+    jitter: float = 0.0  # s, losowo 0..jitter dokładane do latency
+    drop_rate: float = 0.0  # odsetek zapytań bez odpowiedzi
+    exception_rate: float = 0.0  # odsetek odpowiedzi wyjątkiem (device failure)
+    reset_rate: float = 0.0  # odsetek zapytań kończących się zerwaniem połączenia
+    # True: zapytania jednego połączenia obsługiwane po kolei (bramka RS485 bez potokowania)
+    serial: bool = True
+    # True: adres spoza mapy -> wyjątek "illegal data address"; False: zwracane zera
+    strict_map: bool = False
+    input_only: Set[int] = field(default_factory=set)  # adresy odpowiadające tylko na FC 4
+    seed: int | None = 0
+
+
+def default_register_map(defs: Iterable[Dict[str, Any]] | None = None) -> Dict[int, int]:
+    """Wiarygodne surowe wartości dla adresów z definicji sensorów (domyślnie: profil wbudowany)."""
+    if defs is None:
+        defs = bundled_profile().defs()
+    rnd = random.Random(1)
+    regs: Dict[int, int] = {}
+    for d in defs:
+        addr = int(d["address"])
+        scale = float(d.get("scale", 1.0))
+        unit = d.get("unit")
+        if unit == "V" and scale == 0.001:
+            value = 3300 + rnd.randrange(-40, 40)  # napięcie celi w mV
+        elif unit == "V":
+            value = int(rnd.uniform(48, 240) / scale)
+        elif unit == "A":
+            value = int(rnd.uniform(-20, 20) / scale)
+        elif unit == "%":
+            value = int(rnd.uniform(10, 100) / scale)
+        elif unit == "°C":
+            value = rnd.randrange(15, 45)
+        else:
+            value = rnd.randrange(0, 3000)
+        regs[addr] = value & 0xFFFF
+        if d.get("data_type") in ("uint32", "float32"):
+            regs[addr + 1] = rnd.randrange(0x10000)
+    return regs
+
+
+class EnsolarXSimulator:
+    """Serwer asyncio udający bramkę RS485->TCP z falownikiem EnsolarX."""
+
+    def __init__(self, config: SimulatorConfig | None = None, registers: Dict[int, int] | None = None) -> None:
+        self.config = config or SimulatorConfig()
+        self.registers: Dict[int, int] = registers if registers is not None else default_register_map()
+        self._rnd = random.Random(self.config.seed)
+        self._server: asyncio.AbstractServer | None = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self.port = 0
+        self.reset_counters()
+
+    def reset_counters(self) -> None:
+        self.requests = 0
+        self.bytes_rx = 0
+        self.bytes_tx = 0
+        self.dropped = 0
+        self.exceptions = 0
+        self.resets = 0
+        self.connections = 0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+        for w in list(self._writers):
+            w.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        if self._server:
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "EnsolarXSimulator":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def tick(self) -> None:
+        """Niewielki dryf wartości – kolejne cykle widzą zmiany."""
+        for addr in self.registers:
+            if self._rnd.random() < 0.3:
+                self.registers[addr] = (self.registers[addr] + self._rnd.choice((-1, 1))) & 0xFFFF
+
+    def _read(self, fc: int, address: int, count: int) -> bytes | int:
+        """Treść odpowiedzi FC 3/4 albo kod wyjątku."""
+        cfg = self.config
+        if not 1 <= count <= 125:
+            return EXC_ILLEGAL_ADDRESS
+        addrs = range(address, address + count)
+        if fc == 3 and any(a in cfg.input_only for a in addrs):
+            return EXC_ILLEGAL_ADDRESS
+        if cfg.strict_map and any(a not in self.registers for a in addrs):
+            return EXC_ILLEGAL_ADDRESS
+        values: List[int] = [self.registers.get(a, 0) for a in addrs]
+        return struct.pack(f">BB{count}H", fc, count * 2, *values)
+
+    def _write(self, fc: int, pdu: bytes) -> bytes | int:
+        """Treść odpowiedzi FC 6/16 albo kod wyjątku."""
+        cfg = self.config
+        if fc == 6:
+            address, value = struct.unpack_from(">HH", pdu, 1)
+            values = [value]
+        else:
+            address, count, nbytes = struct.unpack_from(">HHB", pdu, 1)
+            if not 1 <= count <= 123 or nbytes != count * 2 or len(pdu) < 6 + nbytes:
+                return EXC_ILLEGAL_ADDRESS
+            values = list(struct.unpack_from(f">{count}H", pdu, 6))
+        addrs = range(address, address + len(values))
+        if any(a in cfg.input_only for a in addrs):
+            return EXC_ILLEGAL_ADDRESS
+        if cfg.strict_map and any(a not in self.registers for a in addrs):
+            return EXC_ILLEGAL_ADDRESS
+        for a, v in zip(addrs, values):
+            self.registers[a] = v
+        return pdu[:5] if fc == 6 else struct.pack(">BHH", fc, address, len(values))
+
+    async def _respond(self, writer: asyncio.StreamWriter, tid: int, unit: int, pdu: bytes) -> None:
+        cfg = self.config
+        delay = cfg.latency + (self._rnd.random() * cfg.jitter if cfg.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        roll = self._rnd.random()
+        if roll < cfg.reset_rate:
+            self.resets += 1
+            writer.transport.abort()
+            return
+        roll -= cfg.reset_rate
+        if roll < cfg.drop_rate:
+            self.dropped += 1
+            return
+        roll -= cfg.drop_rate
+
+        fc = pdu[0]
+        if roll < cfg.exception_rate:
+            body: bytes | int = EXC_DEVICE_FAILURE
+        elif fc in (3, 4) and len(pdu) >= 5:
+            address, count = struct.unpack_from(">HH", pdu, 1)
+            body = self._read(fc, address, count)
+        elif fc in (6, 16) and len(pdu) >= 5:
+            body = self._write(fc, pdu)
+        else:
+            body = EXC_ILLEGAL_FUNCTION
+        if isinstance(body, int):
+            self.exceptions += 1
+            body = bytes((fc | 0x80, body))
+
+        frame = struct.pack(">HHHB", tid, 0, len(body) + 1, unit) + body
+        self.bytes_tx += len(frame)
+        if not writer.is_closing():
+            writer.write(frame)
+            await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        self._writers.add(writer)
+        handler = asyncio.current_task()
+        if handler is not None:
+            self._handlers.add(handler)
+        tasks: Set[asyncio.Task] = set()
+        try:
+            while True:
+                hdr = await reader.readexactly(7)
+                tid, _, length, unit = struct.unpack(">HHHB", hdr)
+                pdu = await reader.readexactly(length - 1)
+                self.requests += 1
+                self.bytes_rx += 7 + len(pdu)
+                if unit != self.config.unit_id and unit not in self.config.extra_units:
+                    continue  # brak urządzenia o tym adresie – bramka milczy
+                if self.config.serial:
+                    await self._respond(writer, tid, unit, pdu)
+                else:
+                    task = asyncio.ensure_future(self._respond(writer, tid, unit, pdu))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._writers.discard(writer)
+            self._handlers.discard(handler)
+            writer.close()
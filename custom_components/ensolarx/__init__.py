@@ -4,6 +4,7 @@ import asyncio
 import logging
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryError
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.const import CONF_HOST, CONF_PORT
 
@@ -12,10 +13,36 @@ from .const import (
     PLATFORMS,
     CONF_UNIT_ID,
     CONF_SCAN_INTERVAL,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_GAP,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MEDIUM_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_STALE_AFTER,
+    CONF_WATCH_INTERVAL,
+    CONF_PROFILE,
+    CONF_GROUPS,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MEDIUM_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_STALE_AFTER,
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_PROFILE,
 )
-from .modbus_client import ModbusTcpClient
+from .aggregation import async_remove_energy_state
+from .connection_pool import get_pool
 from .coordinator import EnsolarXCoordinator
+from .persistence import entry_store
+from .profiles import ProfileError, async_clear_profile_cache, async_get_profile
+from .register_map import async_remove_register_map
+from .services import async_setup_services
+from .watch import StatusWatcher
+from .writer import RegisterWriteQueue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +50,7 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Set up the EnsolarX integration (domain)."""
     hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
     return True
 
 
@@ -35,43 +63,114 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     unit_id = entry.data.get(CONF_UNIT_ID, 1)
     scan_interval = entry.data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
-    # Jeden klient na wpis konfiguracyjny
-    client = ModbusTcpClient(host, port=port, unit_id=unit_id)
+    # profil mapy rejestrów i włączone grupy – z opcji, a dla starszych wpisów z danych
+    profile_id = entry.options.get(CONF_PROFILE, entry.data.get(CONF_PROFILE, DEFAULT_PROFILE))
+    groups = entry.options.get(CONF_GROUPS, entry.data.get(CONF_GROUPS))
+    try:
+        profile = await async_get_profile(hass, profile_id)
+    except ProfileError as err:
+        raise ConfigEntryError(str(err)) from err
+
+    # Jedno połączenie na bramkę (host:port); wpis dostaje widok dla swojego unit ID
+    pool = get_pool(hass)
+    client = pool.acquire(
+        entry.entry_id,
+        host,
+        port,
+        unit_id,
+        max_in_flight=entry.data.get(CONF_MAX_IN_FLIGHT, DEFAULT_MAX_IN_FLIGHT),
+    )
 
-    # Opcjonalna próba wstępnego połączenia (nie przerywa setupu przy błędzie)
+    # blokada wpisu: cykl odpytywania i zapisy ustawień nie przeplatają się
+    lock = asyncio.Lock()
+    coordinator = EnsolarXCoordinator(
+        hass,
+        client,
+        scan_interval_s=scan_interval,
+        max_block_size=entry.data.get(CONF_MAX_BLOCK_SIZE, DEFAULT_MAX_BLOCK_SIZE),
+        max_gap=entry.data.get(CONF_MAX_GAP, DEFAULT_MAX_GAP),
+        medium_interval_s=entry.data.get(CONF_MEDIUM_INTERVAL, DEFAULT_MEDIUM_INTERVAL),
+        slow_interval_s=entry.data.get(CONF_SLOW_INTERVAL, DEFAULT_SLOW_INTERVAL),
+        entry_id=entry.entry_id,
+        max_scan_interval_s=entry.data.get(CONF_MAX_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL),
+        lock=lock,
+        stale_after_s=entry.data.get(CONF_STALE_AFTER, DEFAULT_STALE_AFTER),
+        defs=profile.defs(groups),
+    )
     try:
-        await client.connect()
-    except Exception as err:
-        _LOGGER.warning("EnsolarX: wstępne połączenie Modbus nieudane: %s", err)
+        restored = await coordinator.async_load_state()
+    except BaseException:
+        await pool.release(entry.entry_id, host, port)
+        raise
 
-    coordinator = EnsolarXCoordinator(hass, client, scan_interval_s=scan_interval)
-    # Pierwsze odświeżenie w trakcie SETUP_IN_PROGRESS jest dozwolone
-    await coordinator.async_config_entry_first_refresh()
+    watcher = StatusWatcher(
+        hass, coordinator, entry.entry_id, entry.data.get(CONF_WATCH_INTERVAL, DEFAULT_WATCH_INTERVAL)
+    )
 
     hass.data[DOMAIN][entry.entry_id] = {
         "client": client,
-        "lock": asyncio.Lock(),
+        "lock": lock,
+        "writer": RegisterWriteQueue(hass, entry, coordinator, lock),
         "entry_data": entry.data,
+        "profile": profile,
         "coordinator": coordinator,
+        "watcher": watcher,
     }
+    # zmiana profilu / grup w opcjach wymaga ponownego zbudowania planu i encji
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Encje powstają od razu (z wartościami z migawki, jeśli jest); pierwszy odczyt
+    # z urządzenia idzie w tle i nie wstrzymuje startu HA przy wolnej bramce
+    try:
+        await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    except BaseException:
+        hass.data[DOMAIN].pop(entry.entry_id, None)
+        await pool.release(entry.entry_id, host, port)
+        raise
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN}_first_refresh_{entry.entry_id}"
+    )
+    # szybka pętla rejestrów statusu – zadanie wpisu, anulowane przy jego wyładowaniu
+    if watcher.enabled:
+        entry.async_create_background_task(
+            hass, watcher.async_run(), f"{DOMAIN}_watch_{entry.entry_id}"
+        )
     _LOGGER.info(
-        "EnsolarX: entry %s skonfigurowany (%s:%s, unit=%s, interval=%ss)",
-        entry.entry_id, host, port, unit_id, scan_interval
+        "EnsolarX: entry %s skonfigurowany (%s:%s, unit=%s, interval=%ss, profil=%s, rejestrów: %s, "
+        "wpisów na bramce: %s, migawka: %s)",
+        entry.entry_id, host, port, unit_id, scan_interval, profile.id, len(coordinator.defs),
+        pool.shared_by(host, port), "tak" if restored else "nie",
     )
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     data = hass.data[DOMAIN].pop(entry.entry_id, None)
+    # ponowne wczytanie wpisu (także po zmianie opcji) czyta pliki profili od nowa
+    async_clear_profile_cache(hass)
+
+    if data and "writer" in data:
+        # zapisy z ostatniej chwili idą jeszcze przez bieżące połączenie
+        await data["writer"].async_shutdown()
 
     if data and "client" in data:
+        client = data["client"]
         try:
-            await data["client"].close()
+            await get_pool(hass).release(entry.entry_id, client.host, client.port)
         except Exception as err:
             _LOGGER.debug("EnsolarX: błąd przy zamykaniu klienta: %s", err)
 
-    return unload_ok
\ No newline at end of file
+    return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a deleted config entry."""
+    await async_remove_register_map(hass, entry.entry_id)
+    await async_remove_energy_state(hass, entry.entry_id)
+    await entry_store(hass, entry.entry_id, "snapshot").async_remove()
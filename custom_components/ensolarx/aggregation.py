@@ -0,0 +1,195 @@
+"""Agregacja w koordynatorze: energia z mocy, liczniki dzienne i okna 5-minutowe."""
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DAILY_RESET_RATIO,
+    DOWNSAMPLE_WINDOW,
+    ENERGY_INTEGRATIONS,
+    MAX_INTEGRATION_GAP,
+    TIER_FAST,
+)
+from .persistence import ThrottledSave, entry_store
+from .planner import poll_tier
+
+_LOGGER = logging.getLogger(__name__)
+
+SAVE_INTERVAL = 60  # seconds
+
+
+async def async_remove_energy_state(hass: HomeAssistant, entry_id: str) -> None:
+    await entry_store(hass, entry_id, "energy").async_remove()
+
+
+@dataclass
+class DerivedSensor:
+    """Opis wielkości wyliczanej w koordynatorze (tworzy encję sensora)."""
+
+    name: str
+    unit: str
+    kind: str  # energy | total | window | metric
+    precision: int | None = None
+    deadband: float = 0.0
+    deadband_rel: float = 0.0
+
+
+@dataclass
+class WindowStats:
+    start: float
+    min: float
+    max: float
+    total: float
+    samples: int
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.samples
+
+
+class EnergyAggregator:
+    """Etap agregacji wyników cyklu, stan trwały per wpis konfiguracyjny.
+
+    * energia (kWh) całkowana z mocy metodą trapezów między kolejnymi odczytami –
+      przerwy dłuższe niż ``MAX_INTEGRATION_GAP`` nie są całkowane;
+    * liczniki dzienne (``daily_counter``) zamieniane na narastające sumy – spadek
+      wartości w nowym dniu lub prawie do zera (reset o północy, także gdy HA był
+      wyłączony) dolicza ostatnią wartość dnia do sumy; inny spadek to błędny
+      odczyt i jest pomijany;
+    * dla mocy klasy ``fast``: min/średnia/maks. w oknach ``DOWNSAMPLE_WINDOW``
+      wyrównanych do zegara, publikowane po zamknięciu okna.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant | None,
+        entry_id: str | None,
+        defs: Sequence[Dict[str, Any]],
+        window: float = DOWNSAMPLE_WINDOW,
+    ) -> None:
+        self._store: Store | None = entry_store(hass, entry_id, "energy") if hass and entry_id else None
+        self._saver = ThrottledSave(self._store, self._data_to_save, SAVE_INTERVAL)
+        self._window = window
+        self._integrations = [i for i in ENERGY_INTEGRATIONS if any(d["name"] == i["source"] for d in defs)]
+        self._counters = [d for d in defs if d.get("daily_counter")]
+        self._downsampled = [d["name"] for d in defs if d.get("unit") == "W" and poll_tier(d) == TIER_FAST]
+
+        self.sensors: List[DerivedSensor] = (
+            [DerivedSensor(i["name"], "kWh", "energy") for i in self._integrations]
+            + [DerivedSensor(self.total_name(d["name"]), d.get("unit", ""), "total") for d in self._counters]
+            + [DerivedSensor(self.window_name(n), "W", "window") for n in self._downsampled]
+        )
+
+        self._energy: Dict[str, float] = {i["name"]: 0.0 for i in self._integrations}
+        self._last_power: Dict[str, tuple] = {}  # źródło -> (ts, moc)
+        self._offsets: Dict[str, float] = {d["name"]: 0.0 for d in self._counters}
+        self._last_daily: Dict[str, float] = {}
+        self._last_day: Dict[str, str] = {}  # licznik -> data lokalna ostatniego odczytu
+        self._open: Dict[str, WindowStats] = {}
+        self.windows: Dict[str, WindowStats] = {}  # ostatnie zamknięte okna
+
+    @staticmethod
+    def total_name(name: str) -> str:
+        return name.replace("Dziennie:", "Łącznie:", 1) if name.startswith("Dziennie:") else f"{name} (łącznie)"
+
+    @staticmethod
+    def window_name(name: str) -> str:
+        return f"{name} (5 min)"
+
+    def window_stats(self, window_name: str) -> WindowStats | None:
+        """Ostatnie zamknięte okno dla sensora o nazwie ``window_name(źródło)``."""
+        for name in self._downsampled:
+            if self.window_name(name) == window_name:
+                return self.windows.get(name)
+        return None
+
+    async def async_load(self) -> None:
+        if self._store is None:
+            return
+        data = await self._store.async_load() or {}
+        for name, value in data.get("energy", {}).items():
+            if name in self._energy:
+                self._energy[name] = float(value)
+        for name, value in data.get("offsets", {}).items():
+            if name in self._offsets:
+                self._offsets[name] = float(value)
+        self._last_daily = {n: float(v) for n, v in data.get("last_daily", {}).items() if n in self._offsets}
+        self._last_day = {n: str(v) for n, v in data.get("last_day", {}).items() if n in self._offsets}
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {
+            "energy": self._energy,
+            "offsets": self._offsets,
+            "last_daily": self._last_daily,
+            "last_day": self._last_day,
+        }
+
+    def update(self, values: Dict[str, Any], now: float) -> Dict[str, Any]:
+        """Przetwórz wyniki cyklu (czas ``now`` – epoch); zwraca wartości wyliczone."""
+        out: Dict[str, Any] = {}
+        changed = False
+
+        for integ in self._integrations:
+            name, source = integ["name"], integ["source"]
+            power = values.get(source)
+            if isinstance(power, (int, float)) and math.isfinite(power):
+                last = self._last_power.get(source)
+                if last is not None and last[0] != now:
+                    dt = now - last[0]
+                    if 0 < dt <= MAX_INTEGRATION_GAP:
+                        # trapez: średnia moc z dwóch odczytów x czas, W*s -> kWh
+                        self._energy[name] += (last[1] + power) / 2 * dt / 3_600_000
+                        changed = True
+                if last is None or last[0] != now:
+                    self._last_power[source] = (now, float(power))
+            out[name] = round(self._energy[name], 4)
+
+        today = time.strftime("%Y-%m-%d", time.localtime(now))
+        for d in self._counters:
+            name = d["name"]
+            value = values.get(name)
+            if isinstance(value, (int, float)):
+                last = self._last_daily.get(name)
+                if last is not None and value < last:
+                    if self._last_day.get(name, today) == today and value > last * DAILY_RESET_RATIO:
+                        _LOGGER.debug("EnsolarX: pominięty spadek licznika dziennego %s (%s -> %s)", name, last, value)
+                        out[self.total_name(name)] = round(self._offsets[name] + last, 3)
+                        continue
+                    _LOGGER.debug("EnsolarX: reset licznika dziennego %s (%s -> %s)", name, last, value)
+                    self._offsets[name] += last
+                if last != value or self._last_day.get(name) != today:
+                    self._last_daily[name] = float(value)
+                    self._last_day[name] = today
+                    changed = True
+                out[self.total_name(name)] = round(self._offsets[name] + value, 3)
+
+        for name in self._downsampled:
+            value = values.get(name)
+            if not isinstance(value, (int, float)):
+                continue
+            start = now - now % self._window
+            cur = self._open.get(name)
+            if cur is not None and cur.start != start:
+                self.windows[name] = cur
+                cur = None
+            if cur is None:
+                self._open[name] = WindowStats(start, value, value, value, 1)
+            else:
+                cur.min = min(cur.min, value)
+                cur.max = max(cur.max, value)
+                cur.total += value
+                cur.samples += 1
+            done = self.windows.get(name)
+            if done is not None:
+                out[self.window_name(name)] = round(done.mean, 1)
+
+        if changed:
+            self._saver.schedule()
+        return out
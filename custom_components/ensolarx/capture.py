@@ -0,0 +1,256 @@
+"""Przechwytywanie z wysoką częstotliwością (diagnostyka balansowania BMS i skoków obciążenia).
+
+Wybrane rejestry są odczytywane co ``interval`` sekund przez ograniczony czas,
+bez zapisów stanu encji. Próbki trafiają do bufora pierścieniowego jako binarne
+rekordy ``<d{n}H`` (znacznik czasu epoch + surowe rejestry wszystkich bloków), a po
+zakończeniu są dekodowane i eksportowane do CSV i NPY razem z podsumowaniem.
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import math
+import os
+import struct
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import CELL_VOLTAGE_ADDRESSES, DOMAIN, MODBUS_MAX_READ_REGISTERS
+
+_LOGGER = logging.getLogger(__name__)
+
+# presety: nazwa -> zakres adresów (włącznie)
+CAPTURE_PRESETS: Dict[str, Tuple[int, int]] = {
+    "cells": (62, 85),  # różnica napięć + napięcia celi 1–16
+    "power": (1, 18),  # napięcia, prądy i moce falownika
+}
+
+MIN_CAPTURE_INTERVAL = 0.05  # s
+MAX_CAPTURE_DURATION = 600  # s
+MAX_CAPTURE_SAMPLES = 100_000
+EVENT_CAPTURE_FINISHED = f"{DOMAIN}_capture_finished"
+
+
+class CaptureRing:
+    """Bufor pierścieniowy rekordów stałej długości w jednym ``bytearray``.
+
+    Po zapełnieniu najstarsze rekordy są nadpisywane (licznik ``overwritten``).
+    """
+
+    def __init__(self, registers: int, capacity: int) -> None:
+        self._record = struct.Struct(f"<d{registers}H")
+        self.capacity = max(1, int(capacity))
+        self._buf = bytearray(self._record.size * self.capacity)
+        self._next = 0
+        self._len = 0
+        self.overwritten = 0
+
+    @property
+    def record_size(self) -> int:
+        return self._record.size
+
+    def __len__(self) -> int:
+        return self._len
+
+    def append(self, ts: float, regs: Sequence[int]) -> None:
+        self._record.pack_into(self._buf, self._next * self._record.size, ts, *regs)
+        self._next = (self._next + 1) % self.capacity
+        if self._len < self.capacity:
+            self._len += 1
+        else:
+            self.overwritten += 1
+
+    def records(self) -> Iterator[Tuple[Any, ...]]:
+        """Rekordy od najstarszego: (ts, r0, r1, ...)."""
+        size = self._record.size
+        first = (self._next - self._len) % self.capacity
+        view = memoryview(self._buf)
+        for i in range(self._len):
+            yield self._record.unpack_from(view, ((first + i) % self.capacity) * size)
+
+
+@dataclass
+class CaptureResult:
+    samples: int
+    errors: int
+    overruns: int
+    duration: float
+    csv_path: str | None
+    npy_path: str | None
+    stats: Dict[str, Dict[str, float]]
+    cell_spread: Dict[str, float] | None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "samples": self.samples,
+            "errors": self.errors,
+            "overruns": self.overruns,
+            "duration": round(self.duration, 3),
+            "rate_hz": round(self.samples / self.duration, 2) if self.duration else 0.0,
+            "csv_path": self.csv_path,
+            "npy_path": self.npy_path,
+            "stats": self.stats,
+            "cell_spread": self.cell_spread,
+        }
+
+
+def select_defs(defs: Sequence[Dict[str, Any]], first: int, last: int) -> List[Dict[str, Any]]:
+    return [d for d in defs if first <= int(d["address"]) <= last]
+
+
+def _write_npy(path: str, rows: List[List[float]], columns: int) -> None:
+    """Minimalny zapis NPY v1.0 (float64, C-order) bez zależności od numpy."""
+    header = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d, %d), }" % (len(rows), columns)
+    # nagłówek wyrównany do 64 bajtów, zakończony znakiem nowej linii
+    pad = 64 - (10 + len(header) + 1) % 64
+    header = header + " " * (pad % 64) + "\n"
+    row = struct.Struct(f"<{columns}d")
+    with open(path, "wb") as f:
+        f.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(header)) + header.encode("latin1"))
+        for r in rows:
+            f.write(row.pack(*r))
+
+
+def _summarize(
+    names: Sequence[str], rows: List[List[float]], cell_columns: Sequence[int]
+) -> Tuple[Dict[str, Dict[str, float]], Dict[str, float] | None]:
+    stats: Dict[str, Dict[str, float]] = {}
+    for col, name in enumerate(names, start=1):
+        values = [r[col] for r in rows if not math.isnan(r[col])]
+        if values:
+            stats[name] = {
+                "min": min(values),
+                "max": max(values),
+                "mean": round(sum(values) / len(values), 6),
+            }
+    spread = None
+    if len(cell_columns) > 1 and rows:
+        spreads = [max(r[c] for c in cell_columns) - min(r[c] for c in cell_columns) for r in rows]
+        spread = {
+            "min": round(min(spreads), 6),
+            "max": round(max(spreads), 6),
+            "mean": round(sum(spreads) / len(spreads), 6),
+        }
+    return stats, spread
+
+
+async def async_capture(
+    hass: HomeAssistant,
+    coordinator,
+    defs: Sequence[Dict[str, Any]],
+    interval: float,
+    duration: float,
+    path_prefix: str | None,
+) -> CaptureResult:
+    """Przechwyć ``defs`` co ``interval`` s przez ``duration`` s i wyeksportuj wynik.
+
+    Regularne odpytywanie koordynatora jest na ten czas wstrzymane, a odczyty idą
+    pod blokadą wpisu. ``path_prefix`` None – tylko podsumowanie, bez plików.
+    """
+    plan = coordinator.plan_for(defs, max_block_size=MODBUS_MAX_READ_REGISTERS, max_gap=16)
+    if not plan:
+        raise ValueError("Brak rejestrów do przechwycenia")
+    total = sum(block.count for block, _ in plan)
+    interval = max(MIN_CAPTURE_INTERVAL, float(interval))
+    duration = min(MAX_CAPTURE_DURATION, float(duration))
+    ring = CaptureRing(total, min(MAX_CAPTURE_SAMPLES, math.ceil(duration / interval) + 1))
+    _LOGGER.info(
+        "EnsolarX: przechwytywanie %s (co %.2fs przez %ss, %s B/próbkę)",
+        ", ".join(str(b) for b, _ in plan), interval, duration, ring.record_size,
+    )
+
+    errors = overruns = 0
+    loop = asyncio.get_running_loop()
+    with coordinator.pause_polling():
+        # blokada wpisu: bez przeplatania z trwającym cyklem i zapisami ustawień
+        async with coordinator.lock:
+            started = loop.time()
+            deadline = started + duration
+            tick = 0
+            while True:
+                due = started + tick * interval
+                if due >= deadline:
+                    break
+                delay = due - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                ts = time.time()
+                try:
+                    parts = await asyncio.gather(
+                        *(
+                            coordinator.read_kind(b.kind, b.start, b.count, per_target=False)
+                            for b, _ in plan
+                        )
+                    )
+                except Exception as err:
+                    errors += 1
+                    _LOGGER.debug("EnsolarX: próbka przechwytywania nieudana: %s", err)
+                else:
+                    if all(len(p) >= b.count for p, (b, _) in zip(parts, plan)):
+                        ring.append(ts, [r for p, (b, _) in zip(parts, plan) for r in p[:b.count]])
+                    else:
+                        errors += 1
+                # próbki, które nie zmieściły się w czasie, są pomijane (bez nadrabiania)
+                behind = int((loop.time() - started) / interval)
+                if behind > tick + 1:
+                    overruns += behind - tick - 1
+                    tick = behind
+                else:
+                    tick += 1
+            elapsed = loop.time() - started
+
+    return await hass.async_add_executor_job(
+        _export, ring, plan, errors, overruns, elapsed, path_prefix
+    )
+
+
+def _export(ring: CaptureRing, plan, errors: int, overruns: int, elapsed: float, path_prefix: str | None) -> CaptureResult:
+    names: List[str] = []
+    cell_columns: List[int] = []
+    offsets: List[int] = []
+    pos = 0
+    for block, decoder in plan:
+        offsets.append(pos)
+        pos += block.count
+        for name, addr in zip(decoder.names, decoder.addresses):
+            names.append(name)
+            if addr in CELL_VOLTAGE_ADDRESSES:
+                cell_columns.append(len(names))
+
+    rows: List[List[float]] = []
+    for rec in ring.records():
+        row = [rec[0]]
+        regs = rec[1:]
+        for (block, decoder), off in zip(plan, offsets):
+            try:
+                row.extend(float(v) for v in decoder.decode(regs[off:off + block.count]))
+            except (ValueError, OverflowError):
+                row.extend([math.nan] * len(decoder.names))
+        rows.append(row)
+
+    csv_path = npy_path = None
+    if path_prefix:
+        os.makedirs(os.path.dirname(path_prefix), exist_ok=True)
+        csv_path = f"{path_prefix}.csv"
+        npy_path = f"{path_prefix}.npy"
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["timestamp", *names])
+            writer.writerows(rows)
+        _write_npy(npy_path, rows, len(names) + 1)
+
+    stats, spread = _summarize(names, rows, cell_columns)
+    return CaptureResult(
+        samples=len(rows),
+        errors=errors,
+        overruns=overruns,
+        duration=elapsed,
+        csv_path=csv_path,
+        npy_path=npy_path,
+        stats=stats,
+        cell_spread=spread,
+    )
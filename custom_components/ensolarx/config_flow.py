@@ -3,20 +3,64 @@ from typing import Any, Dict
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PORT
+from homeassistant.core import callback
+import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN,
     CONF_UNIT_ID,
     CONF_SCAN_INTERVAL,
+    CONF_MAX_BLOCK_SIZE,
+    CONF_MAX_GAP,
+    CONF_MAX_IN_FLIGHT,
+    CONF_MEDIUM_INTERVAL,
+    CONF_SLOW_INTERVAL,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_MAX_SCAN_INTERVAL,
+    CONF_STALE_AFTER,
+    CONF_WATCH_INTERVAL,
+    CONF_PROFILE,
+    CONF_GROUPS,
     DEFAULT_HOST,
     DEFAULT_PORT,
     DEFAULT_UNIT_ID,
     DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_MAX_IN_FLIGHT,
+    DEFAULT_MEDIUM_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_STALE_AFTER,
+    DEFAULT_WATCH_INTERVAL,
+    DEFAULT_PROFILE,
+    MAX_IN_FLIGHT_LIMIT,
+    MODBUS_MAX_READ_REGISTERS,
 )
+from .profiles import ProfileError, async_get_profile, async_list_profiles
+
+
+async def _profile_schema(hass, current: str) -> vol.Schema:
+    profiles = await async_list_profiles(hass)
+    if current not in profiles:
+        current = DEFAULT_PROFILE
+    return vol.Schema({vol.Required(CONF_PROFILE, default=current): vol.In(profiles)})
+
+
+async def _groups_schema(hass, profile_id: str, current: list | None) -> vol.Schema:
+    profile = await async_get_profile(hass, profile_id)
+    names = profile.group_names
+    selected = [g for g in (profile.default_groups if current is None else current) if g in names]
+    return vol.Schema({vol.Required(CONF_GROUPS, default=selected): cv.multi_select(names)})
+
 
 class EnsolarXConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._data: Dict[str, Any] = {}
+
     async def async_step_user(self, user_input: Dict[str, Any] | None = None):
         errors: Dict[str, str] = {}
         if user_input is not None:
@@ -24,15 +68,99 @@ class EnsolarXConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 f"{user_input[CONF_HOST]}:{user_input[CONF_PORT]}:{user_input[CONF_UNIT_ID]}"
             )
             self._abort_if_unique_id_configured()
-            return self.async_create_entry(
-                title=f"EnsolarX {user_input[CONF_HOST]}",
-                data=user_input
-            )
+            self._data = dict(user_input)
+            return await self.async_step_profile()
 
         data_schema = vol.Schema({
             vol.Required(CONF_HOST, default=DEFAULT_HOST): str,
             vol.Required(CONF_PORT, default=DEFAULT_PORT): int,
             vol.Required(CONF_UNIT_ID, default=DEFAULT_UNIT_ID): int,
             vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): vol.All(int, vol.Range(min=5)),
+            vol.Optional(CONF_MAX_SCAN_INTERVAL, default=DEFAULT_MAX_SCAN_INTERVAL): vol.All(int, vol.Range(min=5)),
+            vol.Optional(CONF_MEDIUM_INTERVAL, default=DEFAULT_MEDIUM_INTERVAL): vol.All(int, vol.Range(min=5)),
+            vol.Optional(CONF_SLOW_INTERVAL, default=DEFAULT_SLOW_INTERVAL): vol.All(int, vol.Range(min=5)),
+            vol.Optional(CONF_WATCH_INTERVAL, default=DEFAULT_WATCH_INTERVAL): vol.All(
+                int, vol.Range(min=0, max=60)
+            ),
+            vol.Optional(CONF_HEARTBEAT_INTERVAL, default=DEFAULT_HEARTBEAT_INTERVAL): vol.All(int, vol.Range(min=10)),
+            vol.Optional(CONF_STALE_AFTER, default=DEFAULT_STALE_AFTER): vol.All(
+                int, vol.Any(0, vol.Range(min=60))
+            ),
+            vol.Optional(CONF_MAX_BLOCK_SIZE, default=DEFAULT_MAX_BLOCK_SIZE): vol.All(
+                int, vol.Range(min=1, max=MODBUS_MAX_READ_REGISTERS)
+            ),
+            vol.Optional(CONF_MAX_GAP, default=DEFAULT_MAX_GAP): vol.All(int, vol.Range(min=0, max=64)),
+            vol.Optional(CONF_MAX_IN_FLIGHT, default=DEFAULT_MAX_IN_FLIGHT): vol.All(
+                int, vol.Range(min=1, max=MAX_IN_FLIGHT_LIMIT)
+            ),
         })
         return self.async_show_form(step_id="user", data_schema=data_schema, errors=errors)
+
+    async def async_step_profile(self, user_input: Dict[str, Any] | None = None):
+        """Wybór profilu mapy rejestrów (model / firmware)."""
+        if user_input is not None:
+            self._data[CONF_PROFILE] = user_input[CONF_PROFILE]
+            return await self.async_step_groups()
+        return self.async_show_form(
+            step_id="profile", data_schema=await _profile_schema(self.hass, DEFAULT_PROFILE)
+        )
+
+    async def async_step_groups(self, user_input: Dict[str, Any] | None = None):
+        """Grupy rejestrów odpytywane dla tego urządzenia."""
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_GROUPS]:
+                self._data[CONF_GROUPS] = list(user_input[CONF_GROUPS])
+                return self.async_create_entry(
+                    title=f"EnsolarX {self._data[CONF_HOST]}",
+                    data=self._data
+                )
+            errors["base"] = "no_groups"
+        try:
+            schema = await _groups_schema(self.hass, self._data[CONF_PROFILE], None)
+        except ProfileError:
+            return self.async_abort(reason="invalid_profile")
+        return self.async_show_form(step_id="groups", data_schema=schema, errors=errors)
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: config_entries.ConfigEntry):
+        return EnsolarXOptionsFlow(config_entry)
+
+
+class EnsolarXOptionsFlow(config_entries.OptionsFlow):
+    """Zmiana profilu i grup rejestrów bez usuwania wpisu (wpis jest przeładowywany)."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        self._entry = config_entry
+        self._profile: str = config_entry.options.get(
+            CONF_PROFILE, config_entry.data.get(CONF_PROFILE, DEFAULT_PROFILE)
+        )
+
+    async def async_step_init(self, user_input: Dict[str, Any] | None = None):
+        if user_input is not None:
+            self._profile = user_input[CONF_PROFILE]
+            return await self.async_step_groups()
+        return self.async_show_form(
+            step_id="init", data_schema=await _profile_schema(self.hass, self._profile)
+        )
+
+    async def async_step_groups(self, user_input: Dict[str, Any] | None = None):
+        errors: Dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_GROUPS]:
+                return self.async_create_entry(
+                    title="",
+                    data={CONF_PROFILE: self._profile, CONF_GROUPS: list(user_input[CONF_GROUPS])},
+                )
+            errors["base"] = "no_groups"
+        current = None
+        if self._profile == self._entry.options.get(
+            CONF_PROFILE, self._entry.data.get(CONF_PROFILE, DEFAULT_PROFILE)
+        ):
+            current = self._entry.options.get(CONF_GROUPS, self._entry.data.get(CONF_GROUPS))
+        try:
+            schema = await _groups_schema(self.hass, self._profile, current)
+        except ProfileError:
+            return self.async_abort(reason="invalid_profile")
+        return self.async_show_form(step_id="groups", data_schema=schema, errors=errors)
@@ -0,0 +1,69 @@
+"""Współdzielone połączenia Modbus TCP dla wielu falowników za jedną bramką."""
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Set, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import POOL_KEY
+from .modbus_client import ModbusTcpClient, ModbusUnitClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledConnection:
+    client: ModbusTcpClient
+    entries: Set[str] = field(default_factory=set)
+
+
+class ConnectionPool:
+    """Połączenia liczone referencjami, kluczowane parą (host, port).
+
+    Wpisy z różnymi ``unit_id`` za tą samą bramką RS485->TCP dostają widok
+    ``ModbusUnitClient`` na jedno gniazdo – wiele bramek obsługuje tylko jedno
+    połączenie TCP naraz, a kolejne sesje rywalizowałyby o magistralę. Ostatni
+    zwolniony wpis zamyka połączenie.
+    """
+
+    def __init__(self) -> None:
+        self._connections: Dict[Tuple[str, int], _PooledConnection] = {}
+
+    def acquire(self, entry_id: str, host: str, port: int, unit_id: int, max_in_flight: int = 1) -> ModbusUnitClient:
+        key = (host, port)
+        pooled = self._connections.get(key)
+        if pooled is None:
+            pooled = _PooledConnection(
+                ModbusTcpClient(host, port=port, unit_id=unit_id, max_in_flight=max_in_flight)
+            )
+            self._connections[key] = pooled
+        elif pooled.client.max_in_flight != max_in_flight:
+            _LOGGER.info(
+                "EnsolarX: %s:%s już połączony z max_in_flight=%s – ustawienie %s wpisu %s pominięte",
+                host, port, pooled.client.max_in_flight, max_in_flight, entry_id,
+            )
+        pooled.entries.add(entry_id)
+        return ModbusUnitClient(pooled.client, unit_id)
+
+    def shared_by(self, host: str, port: int) -> int:
+        pooled = self._connections.get((host, port))
+        return len(pooled.entries) if pooled else 0
+
+    async def release(self, entry_id: str, host: str, port: int) -> None:
+        key = (host, port)
+        pooled = self._connections.get(key)
+        if pooled is None:
+            return
+        pooled.entries.discard(entry_id)
+        if not pooled.entries:
+            del self._connections[key]
+            await pooled.client.close()
+
+
+def get_pool(hass: HomeAssistant) -> ConnectionPool:
+    pool = hass.data.get(POOL_KEY)
+    if pool is None:
+        pool = hass.data[POOL_KEY] = ConnectionPool()
+    return pool
@@ -4,78 +4,114 @@ from homeassistant.components.sensor import SensorDeviceClass
 
 # Domain **must** be lowercase and match the folder name
 DOMAIN = "ensolarx"
+# hass.data: pula połączeń współdzielonych przez wpisy za tą samą bramką
+POOL_KEY = f"{DOMAIN}_connections"
 
 CONF_UNIT_ID = "unit_id"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_MAX_BLOCK_SIZE = "max_block_size"
+CONF_MAX_GAP = "max_gap"
+CONF_MAX_IN_FLIGHT = "max_in_flight"
+CONF_MEDIUM_INTERVAL = "medium_interval"
+CONF_SLOW_INTERVAL = "slow_interval"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_STALE_AFTER = "stale_after"
+CONF_WATCH_INTERVAL = "watch_interval"
+CONF_PROFILE = "profile"
+CONF_GROUPS = "groups"
 
 DEFAULT_HOST = "192.168.86.201"
 DEFAULT_PORT = 4196
 DEFAULT_UNIT_ID = 18
 DEFAULT_SCAN_INTERVAL = 10  # seconds (HA minimum is 5)
 
-PLATFORMS = ["sensor"]
+# Register map profile (file name in profiles/ or <config>/ensolarx_profiles/, without extension)
+DEFAULT_PROFILE = "ensolarx_le03mw"
 
-# Default coordinator timing; will be overridden per-entry using the chosen scan_interval
-UPDATE_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+# Batched reads: max registers per request and max unused registers bridged inside a block
+DEFAULT_MAX_BLOCK_SIZE = 40
+DEFAULT_MAX_GAP = 6
+MODBUS_MAX_READ_REGISTERS = 125  # FC 3/4 protocol limit
+
+# Pipelining: requests in flight on one socket (1 = strict one-at-a-time mode)
+DEFAULT_MAX_IN_FLIGHT = 1
+MAX_IN_FLIGHT_LIMIT = 16
+
+# Poll tiers: "fast" runs every scan_interval, the others on their own (longer) intervals
+TIER_FAST = "fast"
+TIER_MEDIUM = "medium"
+TIER_SLOW = "slow"
+POLL_TIERS = (TIER_FAST, TIER_MEDIUM, TIER_SLOW)
+DEFAULT_TIER = TIER_MEDIUM
+DEFAULT_MEDIUM_INTERVAL = 30  # seconds
+DEFAULT_SLOW_INTERVAL = 300  # seconds
 
+# Adaptive scheduling: the fast interval stretches up to this bound when cycles overrun
+DEFAULT_MAX_SCAN_INTERVAL = 60  # seconds
 
-# Sensor definitions from EnsolarX docs (subset enabled)
-# Supported keys:
-#   name, address, unit, data_type ("uint16" | "int16"), scale (float), precision (int)
-SENSOR_DEFS = [
-    {"name": "Moc wejścia PV1", "address": 1, "unit": "W", "data_type": "uint16"},
-    {"name": "Całkowita moc PV", "address": 3, "unit": "W", "data_type": "uint16"},
-    {"name": "Napięcie PV1", "address": 4, "unit": "V", "data_type": "uint16", "scale": 0.1, "precision": 1},
-    {"name": "Prąd PV1", "address": 5, "unit": "A", "data_type": "int16", "scale": 0.1, "precision": 1},
-    {"name": "Napięcie sieci L1", "address": 8, "unit": "V", "data_type": "uint16", "scale": 0.1, "precision": 1},
-    {"name": "Moc obciążenia L1", "address": 11, "unit": "W", "data_type": "uint16"},
-    {"name": "Całkowita moc obciążenia", "address": 14, "unit": "W", "data_type": "uint16"},
-    {"name": "Procent obciążenia", "address": 15, "unit": "%", "data_type": "uint16"},
-    {"name": "Napięcie obciążenia", "address": 16, "unit": "V", "data_type": "uint16"},
-    {"name": "Napięcie baterii", "address": 17, "unit": "V", "data_type": "uint16", "scale": 0.1, "precision": 1},
-    {"name": "Prąd baterii", "address": 18, "unit": "A", "data_type": "int16", "scale": 0.1, "precision": 1},
-    {"name": "Status inwertera", "address": 23, "data_type": "uint16"},
-    {"name": "Tryb pracy inwertera", "address": 24, "data_type": "uint16"},
-    {"name": "Priorytet ładowania", "address": 25, "data_type": "uint16"},
-    {"name": "Powrót po niskim napięciu", "address": 29, "unit": "V", "data_type": "uint16", "scale": 0.1, "precision": 1},
-    {"name": "Powrót rozładowywania", "address": 30, "unit": "V", "data_type": "uint16", "scale": 0.1, "precision": 1},
-    {"name": "Procent baterii (if)", "address": 34, "unit": "%", "data_type": "uint16"},
-    {"name": "Prąd baterii (if)", "address": 35, "unit": "A", "data_type": "int16"},
-    {"name": "Status ładowania z sieci 1", "address": 36, "data_type": "uint16"},
-    {"name": "Status PV = U * I", "address": 45, "data_type": "uint16"},
-    {"name": "Temperatura radiatora", "address": 46, "unit": "°C", "data_type": "int16"},
-    {"name": "SOC baterii", "address": 57, "unit": "%", "data_type": "uint16", "scale": 0.1, "precision": 1},
-    {"name": "Pozostały prąd baterii", "address": 58, "unit": "Ah", "data_type": "int16"},
-    {"name": "Różnica napięć celi", "address": 62, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Stan MOSFETów", "address": 63, "data_type": "uint16"},
-    {"name": "Napięcie celi 1", "address": 70, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 2", "address": 71, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 3", "address": 72, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 4", "address": 73, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 5", "address": 74, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 6", "address": 75, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 7", "address": 76, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 8", "address": 77, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 9", "address": 78, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 10", "address": 79, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 11", "address": 80, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 12", "address": 81, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 13", "address": 82, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 14", "address": 83, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 15", "address": 84, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Napięcie celi 16", "address": 85, "unit": "V", "data_type": "uint16", "scale": 0.001, "precision": 3},
-    {"name": "Temperatura BMS 1", "address": 86, "unit": "°C", "data_type": "int16"},
-    {"name": "Stan BMS", "address": 87, "data_type": "uint16"},
-    {"name": "Przekroczenie napięcia celi", "address": 88, "data_type": "uint16"},
-    {"name": "Temperatura akumulatora", "address": 95, "unit": "°C", "data_type": "int16"},
-    {"name": "Dziennie: Napięcie sieci", "address": 117, "unit": "V", "data_type": "uint16"},
-    {"name": "Dziennie: Moc PV", "address": 118, "unit": "W", "data_type": "uint16"},
-    {"name": "Dziennie: Moc wyjściowa", "address": 119, "unit": "W", "data_type": "uint16"},
-    {"name": "Dziennie: Napięcie baterii", "address": 120, "unit": "V", "data_type": "uint16"},
-    {"name": "Dziennie: Ładowanie", "address": 121, "unit": "W", "data_type": "int16"},
-    {"name": "Dziennie: Rozładowanie", "address": 122, "unit": "W", "data_type": "int16"},
-    {"name": "Dziennie: Do sieci", "address": 123, "unit": "W", "data_type": "int16"},
-    {"name": "Dziennie: Z sieci", "address": 124, "unit": "W", "data_type": "int16"},
-    {"name": "Dziennie: Ładowanie PV1", "address": 125, "unit": "Wh", "data_type": "uint16"},
-    {"name": "Dziennie: Ładowanie PV2", "address": 126, "unit": "Wh", "data_type": "uint16"}
+# Status registers marked "watch" in the profile are re-read this often (0 = off)
+DEFAULT_WATCH_INTERVAL = 1  # seconds
+
+# Entities write state only when the value crosses its deadband, or at least this often
+DEFAULT_HEARTBEAT_INTERVAL = 300  # seconds
+
+# Sensor device classes derived from the unit (state_class: measurement, Wh: total_increasing)
+UNIT_DEVICE_CLASSES = {
+    "W": SensorDeviceClass.POWER,
+    "Wh": SensorDeviceClass.ENERGY,
+    "kWh": SensorDeviceClass.ENERGY,
+    "V": SensorDeviceClass.VOLTAGE,
+    "A": SensorDeviceClass.CURRENT,
+    "°C": SensorDeviceClass.TEMPERATURE,
+}
+
+# Energy integrated from power across polls (trapezoidal Riemann sum), in kWh
+ENERGY_INTEGRATIONS = [
+    {"name": "Energia PV", "source": "Całkowita moc PV"},
+    {"name": "Energia obciążenia", "source": "Całkowita moc obciążenia"},
+]
+# Cross-register metrics computed once per cycle (instead of template sensors).
+# Power from voltage x current of the same channel
+POWER_PRODUCTS = [
+    {"name": "Moc PV1 (U×I)", "voltage": "Napięcie PV1", "current": "Prąd PV1"},
+    {"name": "Moc baterii", "voltage": "Napięcie baterii", "current": "Prąd baterii"},
 ]
+# Net grid flow = load - PV + battery power (battery > 0 while charging, sign of the
+# battery current register); > 0 import from the grid, < 0 export. Conversion losses ignored.
+GRID_BALANCE = {
+    "name": "Przepływ sieci netto",
+    "load": "Całkowita moc obciążenia",
+    "pv": "Całkowita moc PV",
+    "battery": "Moc baterii",
+}
+# BMS cell voltage registers (min/max/mean/delta/imbalance across cells)
+CELL_VOLTAGE_ADDRESSES = range(70, 86)
+# Power samples further apart than this are not integrated (outage, restart)
+MAX_INTEGRATION_GAP = 300  # seconds
+# A daily counter drop is the midnight reset only on a new local day or when the value
+# falls to at most this fraction of the last one; other drops are glitched reads
+DAILY_RESET_RATIO = 0.05
+# Fast-tier power sensors also get min/mean/max over clock-aligned windows
+DOWNSAMPLE_WINDOW = 300  # seconds
+
+# Register writes queued within this window are merged into one FC 16 request
+WRITE_BATCH_DELAY = 0.1  # seconds
+
+# Values older than this are shown as unavailable (0 = only while refreshes fail).
+# Must exceed the slow tier interval, including deferral by the adaptive scheduler.
+DEFAULT_STALE_AFTER = 1800  # seconds
+# Last good values are persisted at most this often (restored at startup)
+SNAPSHOT_SAVE_INTERVAL = 60  # seconds
+
+# Addresses that answer neither FC 3 nor FC 4 are re-probed this often
+QUARANTINE_PROBE_INTERVAL = 3600  # seconds
+# Consecutive cycles a known register must be rejected (illegal address) before both
+# register kinds are tried again and it can be quarantined
+QUARANTINE_AFTER_FAILURES = 3
+
+PLATFORMS = ["sensor", "number", "select"]
+
+# Default coordinator timing; will be overridden per-entry using the chosen scan_interval
+UPDATE_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
+
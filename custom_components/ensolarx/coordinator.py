@@ -3,135 +3,308 @@ from __future__ import annotations
 
 import asyncio
 import logging
-import struct
+import time
+from contextlib import contextmanager
 from datetime import timedelta
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
 
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import SENSOR_DEFS, UPDATE_INTERVAL
+from .const import (
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    DEFAULT_MEDIUM_INTERVAL,
+    DEFAULT_SLOW_INTERVAL,
+    DEFAULT_STALE_AFTER,
+    POLL_TIERS,
+    QUARANTINE_AFTER_FAILURES,
+    SNAPSHOT_SAVE_INTERVAL,
+    TIER_FAST,
+    TIER_MEDIUM,
+    TIER_SLOW,
+    UPDATE_INTERVAL,
+)
+from .aggregation import EnergyAggregator
+from .decoder import DTYPE_CODES, BlockDecoder
+from .derived import DerivedMetrics
+from .metrics import CoordinatorMetrics
+from .modbus_client import CircuitOpenError, ModbusError
+from .persistence import ThrottledSave, entry_store
+from .planner import ReadBlock, data_type, plan_reads, poll_tier, register_count
+from .profiles import bundled_profile
+from .register_map import RegisterKindMap
+from .scheduler import SHED_MAX_DELAY, AdaptiveScheduler
 
 _LOGGER = logging.getLogger(__name__)
 
 
-class ModbusError(Exception):
-    pass
-
-
 class EnsolarXCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
     """Koordynator odczytów Modbus dla EnsolarX/LE-03MW."""
 
-    def __init__(self, hass: HomeAssistant, client, scan_interval_s: int | None = None) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client,
+        scan_interval_s: int | None = None,
+        max_block_size: int = DEFAULT_MAX_BLOCK_SIZE,
+        max_gap: int = DEFAULT_MAX_GAP,
+        medium_interval_s: int = DEFAULT_MEDIUM_INTERVAL,
+        slow_interval_s: int = DEFAULT_SLOW_INTERVAL,
+        entry_id: str | None = None,
+        max_scan_interval_s: int = DEFAULT_MAX_SCAN_INTERVAL,
+        lock: asyncio.Lock | None = None,
+        stale_after_s: int = DEFAULT_STALE_AFTER,
+        defs: Sequence[Dict[str, Any]] | None = None,
+    ) -> None:
         interval = timedelta(seconds=scan_interval_s) if scan_interval_s else UPDATE_INTERVAL
         super().__init__(hass, _LOGGER, name="EnsolarX Coordinator", update_interval=interval)
         self.client = client
-        self._defs: List[Dict[str, Any]] = list(SENSOR_DEFS)
+        # blokada wpisu – cykl odpytywania i zapisy rejestrów nie przeplatają się
+        self.lock = lock or asyncio.Lock()
+        # definicje z profilu wpisu (wybrane grupy); bez nich – grupy domyślne profilu wbudowanego
+        if defs is None:
+            defs = bundled_profile().defs()
+        self._defs: List[Dict[str, Any]] = []
+        for d in defs:
+            if data_type(d) not in DTYPE_CODES:
+                _LOGGER.warning(
+                    "EnsolarX: pomijam %s (addr=%s): nieznany data_type %s",
+                    d["name"], d["address"], data_type(d),
+                )
+                continue
+            self._defs.append(d)
+        # dekodery pojedynczych definicji (odczyt awaryjny i sondy kwarantanny)
+        self._single: Dict[str, BlockDecoder] = {
+            d["name"]: BlockDecoder([d], int(d["address"]), register_count(d)) for d in self._defs
+        }
+        # klasa -> definicje; bez przeglądania słowników w każdym cyklu
+        self._tier_defs: Dict[str, List[Dict[str, Any]]] = {t: [] for t in POLL_TIERS}
+        for d in self._defs:
+            self._tier_defs[poll_tier(d)].append(d)
+        self._max_block_size = max_block_size
+        self._max_gap = max_gap
+        # nauczone typy rejestrów i kwarantanna – trwałe per wpis konfiguracyjny
+        self._kinds = RegisterKindMap(hass, entry_id)
+
+        # klasy odpytywania: "fast" co update_interval, pozostałe według własnych interwałów
+        fast_s = interval.total_seconds()
+        self._tier_intervals: Dict[str, float] = {
+            TIER_FAST: fast_s,
+            TIER_MEDIUM: max(fast_s, float(medium_interval_s)),
+            TIER_SLOW: max(fast_s, float(slow_interval_s)),
+        }
+        self._tier_last: Dict[str, float] = {}
+        # interwał "fast" dopasowywany do czasu cyklu, z odkładaniem niższych klas
+        self.scheduler = AdaptiveScheduler(fast_s, max_scan_interval_s)
+        # plany odczytu blokowego (z dekoderami) per zestaw należnych klas –
+        # cache ważny do zmiany mapy typów
+        self._plans: Dict[frozenset, List[Tuple[ReadBlock, BlockDecoder]]] = {}
+        # bloki odrzucone przez urządzenie w bieżącym cyklu (typ, start, liczba)
+        self._rejected: set[Tuple[str, int, int]] = set()
+        self._plans_version = self._kinds.version
+        _LOGGER.debug(
+            "EnsolarX: plan pełnego odczytu %s definicji: %s",
+            len(self._defs), ", ".join(str(b) for b, _ in self._plan(frozenset(POLL_TIERS))),
+        )
         # cache ostatnich poprawnych wartości – ogranicza "miganie" przy pojedynczych timeoutach
         self._last_ok: Dict[str, Any] = {}
+        # nazwa -> czas (epoch) ostatniego poprawnego odczytu; starsze niż stale_after są nieaktualne
+        self._last_ok_at: Dict[str, float] = {}
+        self.stale_after = float(stale_after_s or 0)
+        # migawka _last_ok w magazynie HA – encje mają wartości od razu po starcie
+        self._snapshot_store = entry_store(hass, entry_id, "snapshot") if hass and entry_id else None
+        self._snapshot_saver = ThrottledSave(
+            self._snapshot_store, self._snapshot_data, SNAPSHOT_SAVE_INTERVAL
+        )
+        # > 0: magistralę zajmuje przechwytywanie (capture), cykle zwracają ostatnie dane
+        self._paused = 0
+        self.metrics = CoordinatorMetrics()
+        # energia z mocy, sumy liczników dziennych, okna 5-minutowe
+        self.aggregator = EnergyAggregator(hass, entry_id, self._defs)
+        # moc U×I, bilans sieci, statystyki celi – zamiast sensorów szablonowych
+        self.derived = DerivedMetrics(self._defs)
 
         # jeżeli klient ma ustawienia retry, wykorzystamy je; w przeciwnym razie sensowne domyślne
         self._retry_attempts: int = getattr(self.client, "retry_attempts", 2)
         self._retry_delay: float = getattr(self.client, "retry_delay", 0.15)
 
+    async def async_load_state(self) -> bool:
+        """Wczytaj trwały stan koordynatora (przed pierwszym odświeżeniem).
+
+        Zwraca True, jeśli przywrócono migawkę ostatnich wartości – ``data`` jest
+        wtedy wypełnione i encje mogą powstać bez czekania na odczyt.
+        """
+        await self._kinds.async_load()
+        await self.aggregator.async_load()
+        if self._snapshot_store is None:
+            return False
+        snapshot = await self._snapshot_store.async_load() or {}
+        known = set(self._single)
+        values = {n: v for n, v in snapshot.get("values", {}).items() if n in known}
+        if not values:
+            return False
+        self._last_ok.update(values)
+        self._last_ok_at.update(
+            (n, float(t)) for n, t in snapshot.get("read_at", {}).items() if n in values
+        )
+        self.data = {**values, **self.derived.update(values)}
+        _LOGGER.debug("EnsolarX: przywrócono %s wartości z migawki", len(values))
+        return True
+
+    def _snapshot_data(self) -> Dict[str, Any]:
+        return {"values": self._last_ok, "read_at": self._last_ok_at}
+
+    def is_stale(self, name: str) -> bool:
+        """True, jeśli ostatni poprawny odczyt ``name`` jest starszy niż ``stale_after``."""
+        read_at = self._last_ok_at.get(name)
+        return bool(self.stale_after) and read_at is not None and time.time() - read_at > self.stale_after
+
+    @property
+    def defs(self) -> List[Dict[str, Any]]:
+        """Definicje sensorów obsługiwane przez koordynator."""
+        return self._defs
+
+    @property
+    def register_map(self) -> RegisterKindMap:
+        return self._kinds
+
+    @property
+    def polling_paused(self) -> bool:
+        return self._paused > 0
+
+    @contextmanager
+    def pause_polling(self) -> Iterator[None]:
+        """Wstrzymaj regularne odczyty na czas bloku (np. przechwytywania)."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+            if not self._paused:
+                # po przerwie wszystkie klasy są należne
+                self.reset_tier_schedule()
+
     async def _async_update_data(self) -> Dict[str, Any]:
+        if self._paused and self.data is not None:
+            # przechwytywanie w toku – encje zachowują ostatnie wartości
+            return self.data
+
+        async with self.lock:
+            self.metrics.begin_cycle()
+            start = time.monotonic()
+            ok = False
+            try:
+                results = await self._async_poll()
+                ok = True
+                self._snapshot_saver.schedule()
+                return results
+            finally:
+                duration = time.monotonic() - start
+                self.metrics.end_cycle(duration, ok, self.scheduler.interval)
+                self._reschedule(start, duration)
+
+    def apply_registers(self, regs: Dict[int, int]) -> None:
+        """Wstaw świeżo zapisane/odczytane rejestry do danych bez czekania na cykl."""
+        values: Dict[str, Any] = {}
+        for d in self._defs:
+            addr = int(d["address"])
+            if addr in regs and register_count(d) == 1:
+                value = self._single[d["name"]].decode([regs[addr]])[0]
+                values[d["name"]] = self._last_ok[d["name"]] = value
+                self._last_ok_at[d["name"]] = time.time()
+        self.publish(values)
+
+    async def async_read_plan(self, plan: Sequence[Tuple[ReadBlock, BlockDecoder]]) -> Dict[str, Any]:
+        """Odczyt poza cyklem (np. pętla obserwacji) – bez zmiany harmonogramu klas.
+
+        Wartości trafiają do cache ostatnich odczytów; blok odrzucony jest czytany
+        pojedynczo jak w cyklu, a bez połączenia zwraca poprzednie wartości.
+        Publikację danych zostawia wywołującemu.
+        """
         results: Dict[str, Any] = {}
         errors: List[Tuple[int, str]] = []
+        block_regs = await asyncio.gather(*(self._read_block(b) for b, _ in plan))
+        for (block, decoder), regs in zip(plan, block_regs):
+            if regs is None and self._circuit_open():
+                self._keep_last(decoder, results)
+            elif regs is None:
+                await self._read_block_singly(block, results, errors)
+            else:
+                self._store_decoded(decoder, regs, results, errors)
+        for a, msg in errors:
+            _LOGGER.warning("EnsolarX: problem z adresem %s: %s", a, msg)
+        return results
 
-        for d in self._defs:
-            addr: int = d["address"]
-            dtype: str = d.get("dtype") or d.get("data_type", "uint16")
-            name: str = d["name"]
-            unit_type: str = d.get("input_type", "holding")  # holding | input
-            scale: float = float(d.get("scale", 1.0))
-            precision = d.get("precision")
-            word_swap: bool = bool(d.get("word_swap", False))
-            fallback: bool = bool(d.get("fallback", True))
-
-            count = 1 if dtype in ("uint16", "int16") else 2
-
-            async def _read_once(kind: str) -> List[int]:
-                if kind == "holding":
-                    return await self.client.read_holding_registers(addr, count)
-                return await self.client.read_input_registers(addr, count)
-
-            # próby odczytu: najpierw deklarowany typ, ewentualnie fallback na drugi
-            tried_labels: List[str] = []
-            regs: List[int] | None = None
-            err_primary: Exception | None = None
-            err_fallback: Exception | None = None
-
-            # RETRY pętla dla primary
-            for attempt in range(1, self._retry_attempts + 1):
-                try:
-                    regs = await _read_once(unit_type)
-                    tried_labels.append(f"{unit_type}[{count}w]")
-                    break
-                except Exception as e1:
-                    err_primary = e1
-                    tried_labels.append(f"{unit_type}[{count}w]")
-                    if attempt < self._retry_attempts:
-                        await asyncio.sleep(self._retry_delay)
-            # fallback, jeśli wciąż brak i dozwolony
-            if regs is None and fallback:
-                other = "input" if unit_type == "holding" else "holding"
-                for attempt in range(1, self._retry_attempts + 1):
-                    try:
-                        regs = await _read_once(other)
-                        tried_labels.append(f"{other}[{count}w]")
-                        break
-                    except Exception as e2:
-                        err_fallback = e2
-                        tried_labels.append(f"{other}[{count}w]")
-                        if attempt < self._retry_attempts:
-                            await asyncio.sleep(self._retry_delay)
-
-            if not regs:
-                host = getattr(self.client, "host", "?")
-                port = getattr(self.client, "port", "?")
-                unit_id = getattr(self.client, "unit_id", "?")
-                e1_name = type(err_primary).__name__ if err_primary else ""
-                e2_name = type(err_fallback).__name__ if err_fallback else ""
-                e1_msg = f"{e1_name}: {err_primary}" if err_primary else ""
-                e2_msg = f"{e2_name}: {err_fallback}" if err_fallback else ""
-                _LOGGER.warning(
-                    "EnsolarX: problem z adresem %s: %s addr=%s dtype=%s tried=%s | %s / %s | host=%s port=%s unit_id=%s",
-                    addr,
-                    name,
-                    addr,
-                    dtype,
-                    ",".join(tried_labels) or "-",
-                    e1_msg,
-                    e2_msg,
-                    host,
-                    port,
-                    unit_id,
-                )
-                # jeśli mamy poprzednią dobrą wartość – zostaw ją, żeby nie „migało”
-                if name in self._last_ok:
-                    results[name] = self._last_ok[name]
-                    results[str(addr)] = self._last_ok[name]
-                continue
+    def publish(self, values: Dict[str, Any]) -> None:
+        """Wstaw wartości odczytane poza cyklem do danych koordynatora.
 
-            # dekodowanie + skalowanie
-            try:
-                value = self._decode_registers(regs, dtype, word_swap)
-            except Exception as dec_err:
-                errors.append((addr, f"decode error: {dec_err}"))
-                # zachowaj poprzednią wartość, jeśli była
-                if name in self._last_ok:
-                    results[name] = self._last_ok[name]
-                    results[str(addr)] = self._last_ok[name]
+        Bez ``async_set_updated_data`` – ten przestawia licznik odświeżania, więc
+        częste zmiany statusu odkładałyby regularny cykl w nieskończoność.
+        """
+        data = dict(self.data or {})
+        data.update(values)
+        data.update(self.derived.update(data))
+        self.data = data
+        self.async_update_listeners()
+
+    def _reschedule(self, start: float, duration: float) -> None:
+        """Dopasuj interwał kolejnego cyklu do zmierzonego czasu odczytu."""
+        old = self.scheduler.interval
+        interval = self.scheduler.record(start, duration)
+        if abs(interval - old) >= 0.05 * old:
+            _LOGGER.debug(
+                "EnsolarX: interwał odpytywania %.1fs -> %.1fs (cykl %.2fs)",
+                old, interval, self.scheduler.cycle_time,
+            )
+            self.update_interval = timedelta(seconds=interval)
+
+    async def _async_poll(self) -> Dict[str, Any]:
+        results: Dict[str, Any] = {}
+        errors: List[Tuple[int, str]] = []
+
+        if self._circuit_open():
+            # urządzenie nieosiągalne – nie marnujemy cyklu na timeouty
+            raise UpdateFailed(
+                f"Modbus: urządzenie nieosiągalne (obwód otwarty, "
+                f"{getattr(self.client, 'consecutive_failures', '?')} kolejnych błędów)"
+            )
+
+        now = time.monotonic()
+        due = self._due_tiers(now)
+        plan = self._plan(due)
+        # adresy z kwarantanny, dla których nadszedł czas ponownej próby
+        probes = [
+            d for tier in due for d in self._tier_defs[tier]
+            if self._kinds.probe_due(int(d["address"]))
+        ] if self._kinds.has_quarantine else []
+
+        # bloki wysyłane równolegle – klient sam ogranicza liczbę zapytań w locie
+        block_regs = await asyncio.gather(*(self._read_block(b) for b, _ in plan))
+        for tier in due:
+            self._tier_last[tier] = now
+
+        if probes and not self._circuit_open():
+            probed = await asyncio.gather(*(self._read_single(d) for d in probes))
+            for d, single in zip(probes, probed):
+                self._store_single(d, single, results, errors)
+
+        for (block, decoder), regs in zip(plan, block_regs):
+            if regs is None and self._circuit_open():
+                # połączenie padło w trakcie cyklu – bez odczytów pojedynczych
+                self._keep_last(decoder, results)
+                continue
+            if regs is None:
+                await self._read_block_singly(block, results, errors)
                 continue
 
-            if scale != 1.0:
-                value = value * scale
-            if precision is not None and isinstance(value, (int, float)):
-                value = round(value, int(precision))
+            self._store_decoded(decoder, regs, results, errors)
 
-            results[name] = value
-            results[str(addr)] = value
-            self._last_ok[name] = value  # zaktualizuj cache
+        # definicje spoza tego cyklu i adresy w kwarantannie zachowują ostatnie odczytane
+        # wartości (starzejące się według stale_after) – klucze danych się nie zmieniają
+        for name, value in self._last_ok.items():
+            results.setdefault(name, value)
 
         if not results and errors:
             raise UpdateFailed("Modbus: żadnego sensora nie udało się odczytać")
@@ -140,28 +313,276 @@ class EnsolarXCoordinator(DataUpdateCoordinator[Dict[str, Any]]):
         for a, msg in errors:
             _LOGGER.warning("EnsolarX: problem z adresem %s: %s", a, msg)
 
+        results.update(self.derived.update(results))
+        results.update(self.aggregator.update(results, time.time()))
         return results
 
-    @staticmethod
-    def _decode_registers(regs: List[int], dtype: str, word_swap: bool) -> Any:
-        if dtype == "uint16":
-            return int(regs[0] & 0xFFFF)
-
-        if dtype == "int16":
-            val = regs[0]
-            if val & 0x8000:
-                val -= 0x10000
-            return int(val)
-
-        if dtype in ("uint32", "float32"):
-            if len(regs) < 2:
-                raise ValueError("brak dwóch rejestrów dla wartości 32-bit")
-            hi, lo = regs[0], regs[1]
-            if word_swap:
-                hi, lo = lo, hi
-            raw = (hi << 16) | lo
-            if dtype == "uint32":
-                return int(raw & 0xFFFFFFFF)
-            return struct.unpack(">f", raw.to_bytes(4, "big"))[0]
-
-        raise ValueError(f"Nieznany data_type: {dtype}")
+    def reset_tier_schedule(self) -> None:
+        """Następny cykl odczyta wszystkie klasy odpytywania."""
+        self._tier_last.clear()
+
+    def _circuit_open(self) -> bool:
+        return bool(getattr(self.client, "circuit_open", False))
+
+    def _due_tiers(self, now: float) -> frozenset:
+        """Klasy, których interwał upłynął (z tolerancją pół cyklu na jitter).
+
+        Klasy odłożone przez harmonogram są odczytywane dopiero po ``SHED_MAX_DELAY``
+        swoich interwałach.
+        """
+        slack = self.scheduler.interval / 2
+        shed = self.scheduler.shed_tiers
+        due = []
+        for tier, interval in self._tier_intervals.items():
+            if tier in shed:
+                interval *= SHED_MAX_DELAY
+            if tier not in self._tier_last or now - self._tier_last[tier] >= interval - slack:
+                due.append(tier)
+        return frozenset(due)
+
+    def _plan(self, tiers: frozenset) -> List[Tuple[ReadBlock, BlockDecoder]]:
+        """Plan odczytu blokowego dla definicji z podanych klas (cache per zestaw)."""
+        if self._plans_version != self._kinds.version:
+            self._plans.clear()
+            self._plans_version = self._kinds.version
+        plan = self._plans.get(tiers)
+        if plan is None:
+            plan = self.plan_for([d for d in self._defs if poll_tier(d) in tiers])
+            self._plans[tiers] = plan
+        return plan
+
+    def plan_for(
+        self,
+        defs: Sequence[Dict[str, Any]],
+        max_block_size: int | None = None,
+        max_gap: int | None = None,
+    ) -> List[Tuple[ReadBlock, BlockDecoder]]:
+        """Plan odczytu (bloki z dekoderami) dla dowolnych definicji, z nauczonymi typami."""
+        blocks = plan_reads(
+            [d for d in defs if not self._kinds.quarantined(int(d["address"]))],
+            self._max_block_size if max_block_size is None else max_block_size,
+            self._max_gap if max_gap is None else max_gap,
+            kind_of=self._kinds.kind_for,
+            barriers=self._kinds.barriers,
+        )
+        return [(b, BlockDecoder(b.defs, b.start, b.count)) for b in blocks]
+
+    async def read_kind(self, kind: str, addr: int, count: int, per_target: bool = True) -> Sequence[int]:
+        """Odczyt rejestrów danego typu, z pomiarem czasu i rozmiaru ramek.
+
+        ``per_target=False`` – odczyt spoza planu (wykrywanie, przechwytywanie): liczony
+        w sumach, ale bez osobnego histogramu dla adresu.
+        """
+        target = None
+        if per_target:
+            target = f"{kind}[{addr}]" if count == 1 else f"{kind}[{addr}-{addr + count - 1}]"
+        start = time.monotonic()
+        try:
+            if kind == "holding":
+                regs = await self.client.read_holding_registers(addr, count)
+            else:
+                regs = await self.client.read_input_registers(addr, count)
+        except CircuitOpenError:
+            raise  # zapytanie nie zostało wysłane
+        except ModbusError:
+            self.metrics.observe_request(target, count, time.monotonic() - start, ok=False)
+            raise
+        except Exception:
+            self.metrics.observe_request(
+                target, count, time.monotonic() - start, ok=False, answered=False
+            )
+            raise
+        self.metrics.observe_request(target, count, time.monotonic() - start, ok=True)
+        return regs
+
+    async def _read_block_singly(
+        self, block: ReadBlock, results: Dict[str, Any], errors: List[Tuple[int, str]]
+    ) -> None:
+        """Blok odrzucony – odczyt pojedynczy tylko dla definicji z tego bloku."""
+        singles = await asyncio.gather(*(self._read_single(d) for d in block.defs))
+        for d, single in zip(block.defs, singles):
+            self._store_single(d, single, results, errors)
+        self._learn_gaps(block, singles)
+
+    def _learn_gaps(self, block: ReadBlock, singles: Sequence[List[int] | None]) -> None:
+        """Blok odrzucony przez urządzenie, a wszystkie definicje czytelne osobno jako ten
+        sam typ – winne są nieużywane adresy w przerwach; kolejne plany je omijają."""
+        key = (block.kind, block.start, block.count)
+        if key not in self._rejected:
+            return
+        self._rejected.discard(key)
+        if any(single is None for single in singles) or any(
+            self._kinds.kind_for(d) != block.kind for d in block.defs
+        ):
+            return
+        used = {
+            a for d in block.defs
+            for a in range(int(d["address"]), int(d["address"]) + register_count(d))
+        }
+        gaps = [a for a in range(block.start, block.end + 1) if a not in used]
+        if gaps:
+            self._kinds.learn_gap(block.kind, gaps)
+
+    async def _read_block(self, block: ReadBlock) -> List[int] | None:
+        """Odczytaj cały blok; None oznacza konieczność odczytu pojedynczego."""
+        for attempt in range(1, self._retry_attempts + 1):
+            try:
+                regs = await self.read_kind(block.kind, block.start, block.count)
+            except ModbusError as err:
+                # odpowiedź wyjątkiem – ponawianie bloku nic nie da
+                _LOGGER.debug("EnsolarX: blok %s odrzucony przez urządzenie: %s", block, err)
+                if err.illegal_address:
+                    # wyjątki chwilowe (4/5/6) nie świadczą o lukach w mapie
+                    self._rejected.add((block.kind, block.start, block.count))
+                return None
+            except Exception as err:
+                _LOGGER.debug(
+                    "EnsolarX: blok %s próba %s/%s nieudana: %s",
+                    block, attempt, self._retry_attempts, err,
+                )
+                if self._circuit_open():
+                    return None
+                if attempt < self._retry_attempts:
+                    self.metrics.retry()
+                    await asyncio.sleep(self._retry_delay)
+                continue
+            if len(regs) < block.count:
+                _LOGGER.debug(
+                    "EnsolarX: blok %s zwrócił %s z %s rejestrów", block, len(regs), block.count
+                )
+                self._rejected.add((block.kind, block.start, block.count))
+                return None
+            for d in block.defs:
+                self._kinds.learn(int(d["address"]), block.kind)
+            return regs
+        return None
+
+    async def _read_single(self, d: Dict[str, Any]) -> List[int] | None:
+        """Odczyt pojedynczej definicji z retry i ewentualnym fallbackiem typu rejestru.
+
+        Fallback na drugi typ dotyczy adresów, których typ nie jest jeszcze znany, oraz
+        znanych adresów odrzucanych przez ``QUARANTINE_AFTER_FAILURES`` kolejnych cykli.
+        Do kwarantanny trafia tylko adres, dla którego oba typy zostały odrzucone
+        wyjątkiem 1/2 (nieznana funkcja / adres); wyjątki chwilowe (4/5/6) jej nie powodują.
+        """
+        addr: int = d["address"]
+        dtype: str = data_type(d)
+        name: str = d["name"]
+        unit_type: str = self._kinds.kind_for(d)
+        allow_fallback = bool(d.get("fallback", True))
+        fallback: bool = allow_fallback and (
+            not self._kinds.known(addr) or self._kinds.strikes(addr) + 1 >= QUARANTINE_AFTER_FAILURES
+        )
+        count = register_count(d)
+
+        # próby odczytu: najpierw deklarowany typ, ewentualnie fallback na drugi
+        tried_labels: List[str] = []
+        regs: List[int] | None = None
+        err_primary: Exception | None = None
+        err_fallback: Exception | None = None
+
+        # RETRY pętla dla primary
+        for attempt in range(1, self._retry_attempts + 1):
+            try:
+                regs = await self.read_kind(unit_type, addr, count)
+                tried_labels.append(f"{unit_type}[{count}w]")
+                self._kinds.learn(addr, unit_type)
+                break
+            except Exception as e1:
+                err_primary = e1
+                tried_labels.append(f"{unit_type}[{count}w]")
+                if self._circuit_open():
+                    break
+                if attempt < self._retry_attempts:
+                    self.metrics.retry()
+                    await asyncio.sleep(self._retry_delay)
+        # fallback, jeśli wciąż brak i dozwolony
+        if regs is None and fallback and not self._circuit_open():
+            other = "input" if unit_type == "holding" else "holding"
+            self.metrics.fallback()
+            for attempt in range(1, self._retry_attempts + 1):
+                try:
+                    regs = await self.read_kind(other, addr, count)
+                    tried_labels.append(f"{other}[{count}w]")
+                    self._kinds.learn(addr, other)
+                    break
+                except Exception as e2:
+                    err_fallback = e2
+                    tried_labels.append(f"{other}[{count}w]")
+                    if self._circuit_open():
+                        break
+                    if attempt < self._retry_attempts:
+                        self.metrics.retry()
+                        await asyncio.sleep(self._retry_delay)
+
+        if not regs:
+            attempted = [e for e in (err_primary, err_fallback) if e is not None]
+            if attempted and all(isinstance(e, ModbusError) and e.illegal_address for e in attempted):
+                strikes = self._kinds.strike(addr)
+                if err_fallback is not None or (
+                    not allow_fallback and strikes >= QUARANTINE_AFTER_FAILURES
+                ):
+                    # urządzenie odpowiada, ale nie zna tego adresu – nie pytamy co cykl
+                    self._kinds.quarantine(addr)
+            host = getattr(self.client, "host", "?")
+            port = getattr(self.client, "port", "?")
+            unit_id = getattr(self.client, "unit_id", "?")
+            e1_name = type(err_primary).__name__ if err_primary else ""
+            e2_name = type(err_fallback).__name__ if err_fallback else ""
+            e1_msg = f"{e1_name}: {err_primary}" if err_primary else ""
+            e2_msg = f"{e2_name}: {err_fallback}" if err_fallback else ""
+            _LOGGER.warning(
+                "EnsolarX: problem z adresem %s: %s addr=%s dtype=%s tried=%s | %s / %s | host=%s port=%s unit_id=%s",
+                addr,
+                name,
+                addr,
+                dtype,
+                ",".join(tried_labels) or "-",
+                e1_msg,
+                e2_msg,
+                host,
+                port,
+                unit_id,
+            )
+            return None
+        return regs
+
+    def _store_decoded(
+        self,
+        decoder: BlockDecoder,
+        regs: List[int],
+        results: Dict[str, Any],
+        errors: List[Tuple[int, str]],
+    ) -> None:
+        """Zdekoduj blok skompilowanym dekoderem i zapisz wartości."""
+        try:
+            values = decoder.decode(regs)
+        except Exception as dec_err:
+            errors.append((decoder.addresses[0], f"decode error: {dec_err}"))
+            # zachowaj poprzednie wartości, jeśli były
+            self._keep_last(decoder, results)
+            return
+
+        results.update(zip(decoder.names, values))
+        self._last_ok.update(zip(decoder.names, values))  # zaktualizuj cache
+        self._last_ok_at.update(dict.fromkeys(decoder.names, time.time()))
+
+    def _store_single(
+        self,
+        d: Dict[str, Any],
+        regs: List[int] | None,
+        results: Dict[str, Any],
+        errors: List[Tuple[int, str]],
+    ) -> None:
+        decoder = self._single[d["name"]]
+        if not regs:
+            # jeśli mamy poprzednią dobrą wartość – zostaw ją, żeby nie „migało”
+            self._keep_last(decoder, results)
+            return
+        self._store_decoded(decoder, regs, results, errors)
+
+    def _keep_last(self, decoder: BlockDecoder, results: Dict[str, Any]) -> None:
+        last_ok = self._last_ok
+        for name in decoder.names:
+            if name in last_ok:
+                results[name] = last_ok[name]
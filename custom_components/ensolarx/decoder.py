@@ -0,0 +1,102 @@
+"""Skompilowane dekodery bloków rejestrów EnsolarX."""
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .planner import data_type, register_count
+
+# kody struct dla obsługiwanych typów danych (big-endian, słowo starsze pierwsze)
+DTYPE_CODES: Dict[str, str] = {
+    "uint16": "H",
+    "int16": "h",
+    "uint32": "I",
+    "float32": "f",
+}
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class BlockDecoder:
+    """Plan dekodowania bloku rejestrów skompilowany raz z listy definicji.
+
+    Blok jest zamieniany na bajty big-endian (``array('H')`` z klienta – kopią
+    i ``byteswap`` w C, lista – jednym ``struct.pack``) i rozpakowywany
+    jednym (lub kilkoma, gdy definicje nachodzą na siebie) ``unpack_from``, który od
+    razu obsługuje znak int16 oraz 32-bitowe uint/float. Zamiana słów (``word_swap``)
+    to zamiana par rejestrów przed pakowaniem. Skala i zaokrąglenie są stosowane tylko
+    do pól, które ich wymagają.
+    """
+
+    __slots__ = ("count", "names", "addresses", "_pack", "_segments", "_swaps", "_scaled")
+
+    def __init__(self, defs: Sequence[Dict[str, Any]], start: int, count: int) -> None:
+        fields = sorted(defs, key=lambda d: int(d["address"]))
+        for d in fields:
+            if data_type(d) not in DTYPE_CODES:
+                raise ValueError(f"Nieznany data_type: {data_type(d)}")
+            if int(d["address"]) - start + register_count(d) > count:
+                raise ValueError(f"Adres {d['address']} poza blokiem {start}+{count}")
+
+        self.count = count
+        self.names: Tuple[str, ...] = tuple(d["name"] for d in fields)
+        self.addresses: Tuple[int, ...] = tuple(int(d["address"]) for d in fields)
+        self._pack = struct.Struct(f">{count}H")
+
+        # segmenty: (Struct, przesunięcie w bajtach) – kolejny tylko przy nachodzących polach
+        segments: List[Tuple[str, int]] = []
+        fmt, seg_start, pos = "", 0, None
+        for d in fields:
+            off = (int(d["address"]) - start) * 2
+            if pos is None or off < pos:
+                if pos is not None:
+                    segments.append((fmt, seg_start))
+                fmt, seg_start, pos = "", off, off
+            if off > pos:
+                fmt += f"{off - pos}x"
+            fmt += DTYPE_CODES[data_type(d)]
+            pos = off + register_count(d) * 2
+        if pos is not None:
+            segments.append((fmt, seg_start))
+        self._segments = tuple((struct.Struct(">" + f), o) for f, o in segments)
+
+        self._swaps: Tuple[int, ...] = tuple(
+            int(d["address"]) - start
+            for d in fields
+            if register_count(d) == 2 and d.get("word_swap", False)
+        )
+
+        scaled: List[Tuple[int, float, int | None]] = []
+        for i, d in enumerate(fields):
+            scale = float(d.get("scale", 1.0))
+            precision = d.get("precision")
+            if scale != 1.0 or precision is not None:
+                scaled.append((i, scale, None if precision is None else int(precision)))
+        self._scaled = tuple(scaled)
+
+    def decode(self, regs: Sequence[int]) -> List[Any]:
+        """Zdekoduj blok; wartości w kolejności ``names``/``addresses``."""
+        if self._swaps:
+            regs = list(regs)
+            for o in self._swaps:
+                regs[o], regs[o + 1] = regs[o + 1], regs[o]
+        if type(regs) is array:
+            raw = regs[:self.count]
+            if len(raw) < self.count:
+                raise struct.error(f"blok wymaga {self.count} rejestrów, otrzymano {len(raw)}")
+            if _LITTLE_ENDIAN:
+                raw.byteswap()
+        else:
+            raw = self._pack.pack(*regs[:self.count])
+        if len(self._segments) == 1:
+            st, o = self._segments[0]
+            values = list(st.unpack_from(raw, o))
+        else:
+            values = []
+            for st, o in self._segments:
+                values.extend(st.unpack_from(raw, o))
+        for i, scale, precision in self._scaled:
+            v = values[i] * scale if scale != 1.0 else values[i]
+            values[i] = round(v, precision) if precision is not None else v
+        return values
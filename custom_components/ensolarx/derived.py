@@ -0,0 +1,113 @@
+"""Wielkości wyliczane z kilku rejestrów w jednym przebiegu po wynikach cyklu.
+
+Zastępuje sensory szablonowe HA (każdy z nich był przeliczany przy każdej zmianie
+stanu dowolnej encji źródłowej): moc z napięcia i prądu, bilans sieci oraz
+statystyki napięć celi (min./maks./średnia/rozrzut/niezrównoważenie). Wyliczane
+są tylko wielkości, których wszystkie rejestry źródłowe są w wybranych grupach
+profilu.
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, List, Sequence
+
+from .aggregation import DerivedSensor
+from .const import CELL_VOLTAGE_ADDRESSES, GRID_BALANCE, POWER_PRODUCTS
+
+CELL_MIN = "Napięcie celi min."
+CELL_MAX = "Napięcie celi maks."
+CELL_MEAN = "Średnie napięcie celi"
+CELL_DELTA = "Rozrzut napięć celi"
+CELL_IMBALANCE = "Niezrównoważenie celi"
+
+
+def _number(value: Any) -> float | None:
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return value
+    return None
+
+
+class DerivedMetrics:
+    """Etap koordynatora: wielkości pochodne z wartości zdekodowanych w cyklu."""
+
+    def __init__(self, defs: Sequence[Dict[str, Any]]) -> None:
+        names = {d["name"] for d in defs}
+        self._products = [p for p in POWER_PRODUCTS if p["voltage"] in names and p["current"] in names]
+        produced = names | {p["name"] for p in self._products}
+        self._grid = GRID_BALANCE if all(GRID_BALANCE[k] in produced for k in ("load", "pv", "battery")) else None
+        # (numer celi, nazwa) w kolejności adresów
+        cells = sorted(
+            (int(d["address"]), d["name"]) for d in defs if int(d["address"]) in CELL_VOLTAGE_ADDRESSES
+        )
+        self._cells = [(a - CELL_VOLTAGE_ADDRESSES.start + 1, n) for a, n in cells] if len(cells) > 1 else []
+        self._cell_min: int | None = None
+        self._cell_max: int | None = None
+
+        sources: Dict[str, List[str]] = {p["name"]: [p["voltage"], p["current"]] for p in self._products}
+        self.sensors: List[DerivedSensor] = [
+            DerivedSensor(p["name"], "W", "metric", precision=0, deadband_rel=0.01) for p in self._products
+        ]
+        if self._grid is not None:
+            grid = self._grid
+            sources[grid["name"]] = [
+                s for k in ("load", "pv", "battery") for s in sources.get(grid[k], [grid[k]])
+            ]
+            self.sensors.append(DerivedSensor(grid["name"], "W", "metric", precision=0, deadband_rel=0.01))
+        if self._cells:
+            cell_names = [n for _, n in self._cells]
+            for name in (CELL_MIN, CELL_MAX, CELL_MEAN, CELL_DELTA):
+                sources[name] = cell_names
+                self.sensors.append(DerivedSensor(name, "V", "metric", precision=3, deadband=0.001))
+            sources[CELL_IMBALANCE] = cell_names
+            self.sensors.append(DerivedSensor(CELL_IMBALANCE, "%", "metric", precision=2, deadband=0.01))
+        # nazwa wielkości -> rejestry źródłowe (dostępność encji)
+        self.sources = sources
+
+    def attributes(self, name: str) -> Dict[str, Any] | None:
+        """Numer celi dla napięcia min./maks."""
+        if name == CELL_MIN and self._cell_min is not None:
+            return {"cell": self._cell_min}
+        if name == CELL_MAX and self._cell_max is not None:
+            return {"cell": self._cell_max}
+        return None
+
+    def update(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Wylicz wielkości pochodne z ``values``; brak źródła – wielkość pominięta."""
+        out: Dict[str, Any] = {}
+
+        for p in self._products:
+            u, i = _number(values.get(p["voltage"])), _number(values.get(p["current"]))
+            if u is not None and i is not None:
+                out[p["name"]] = round(u * i)
+
+        grid = self._grid
+        if grid is not None:
+            load, pv = _number(values.get(grid["load"])), _number(values.get(grid["pv"]))
+            battery = _number(out.get(grid["battery"], values.get(grid["battery"])))
+            if load is not None and pv is not None and battery is not None:
+                out[grid["name"]] = round(load - pv + battery)
+
+        if self._cells:
+            lo = hi = None
+            lo_cell = hi_cell = 0
+            total = 0.0
+            for cell, name in self._cells:
+                v = _number(values.get(name))
+                if v is None:
+                    # bez kompletu celi min./maks. byłyby mylące
+                    return out
+                total += v
+                if lo is None or v < lo:
+                    lo, lo_cell = v, cell
+                if hi is None or v > hi:
+                    hi, hi_cell = v, cell
+            mean = total / len(self._cells)
+            self._cell_min, self._cell_max = lo_cell, hi_cell
+            out[CELL_MIN] = round(lo, 3)
+            out[CELL_MAX] = round(hi, 3)
+            out[CELL_MEAN] = round(mean, 3)
+            out[CELL_DELTA] = round(hi - lo, 3)
+            # rozrzut względem średniej, w %
+            out[CELL_IMBALANCE] = round((hi - lo) / mean * 100, 2) if mean > 0 else None
+
+        return out
@@ -0,0 +1,42 @@
+"""Diagnostyka wpisu konfiguracyjnego EnsolarX (pobierana z UI Home Assistant)."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, POLL_TIERS
+from .coordinator import EnsolarXCoordinator
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> Dict[str, Any]:
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator: EnsolarXCoordinator = data["coordinator"]
+    client = coordinator.client
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "options": dict(entry.options),
+        "profile": data["profile"].as_dict(),
+        "client": {
+            "unit_id": getattr(client, "unit_id", None),
+            "connected": getattr(client, "connected", None),
+            "max_in_flight": getattr(client, "max_in_flight", None),
+            "breaker_state": getattr(client, "breaker_state", None),
+            "consecutive_failures": getattr(client, "consecutive_failures", None),
+            "stale_frames": getattr(client, "stale_frames", None),
+            "reconnects": getattr(client, "reconnects", None),
+        },
+        "metrics": coordinator.metrics.as_dict(),
+        "scheduler": coordinator.scheduler.as_dict(),
+        "watch": data["watcher"].as_dict(),
+        "plan": [str(block) for block, _ in coordinator.plan_for(coordinator.defs)],
+        "register_map": coordinator.register_map.as_dict(),
+        "tiers": sorted(POLL_TIERS),
+        "last_update_success": coordinator.last_update_success,
+        "data": coordinator.data,
+    }
@@ -0,0 +1,244 @@
+"""Wykrywanie mapy rejestrów: przegląd zakresu adresów dla FC 3 i FC 4.
+
+Zakres jest dzielony na bloki po ``block_size`` rejestrów odpytywane równolegle
+(w granicach ``max_in_flight`` klienta). Blok odrzucony wyjątkiem urządzenia
+lub z niepełną odpowiedzią jest dzielony na połowy aż do pojedynczych adresów –
+ciągłe czytelne obszary kosztują jedno zapytanie, a liczba zapytań rośnie tylko
+wokół granic. Blok bez odpowiedzi (timeout) po ``PROBE_ATTEMPTS`` próbach nie
+jest dzielony – trafia do ``unanswered`` i można go przejrzeć ponownie mniejszymi
+blokami. Wynikiem są czytelne zakresy z surowymi wartościami, sugerowany profil
+(format ``profiles.py``) i plan odczytu blokowego dla koordynatora.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, MODBUS_MAX_READ_REGISTERS
+from .modbus_client import CircuitOpenError, ModbusError
+from .planner import plan_reads, register_count, register_kind
+from .profiles import PROFILE_FORMAT_VERSION, ProfileError, compile_profile
+
+_LOGGER = logging.getLogger(__name__)
+
+REGISTER_KINDS = ("holding", "input")
+MAX_DISCOVERY_SPAN = 2000  # rejestrów na jedno wywołanie
+PROBE_ATTEMPTS = 2  # próby bloku bez odpowiedzi
+EVENT_DISCOVERY_FINISHED = f"{DOMAIN}_discovery_finished"
+
+
+def _ranges(addresses: Sequence[int]) -> List[Tuple[int, int]]:
+    """Posortowane adresy -> ciągłe zakresy (włącznie)."""
+    out: List[Tuple[int, int]] = []
+    for addr in addresses:
+        if out and addr == out[-1][1] + 1:
+            out[-1] = (out[-1][0], addr)
+        else:
+            out.append((addr, addr))
+    return out
+
+
+@dataclass
+class DiscoveryResult:
+    first: int
+    last: int
+    kinds: Tuple[str, ...]
+    requests: int = 0
+    exceptions: int = 0
+    timeouts: int = 0
+    duration: float = 0.0
+    # typ rejestru -> adres -> surowa wartość
+    values: Dict[str, Dict[int, int]] = field(default_factory=dict)
+    unanswered: List[str] = field(default_factory=list)
+    profile: Dict[str, Any] | None = None
+    plan: List[str] = field(default_factory=list)
+    profile_path: str | None = None
+
+    def ranges(self, kind: str) -> List[Tuple[int, int]]:
+        return _ranges(sorted(self.values.get(kind, {})))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "first": self.first,
+            "last": self.last,
+            "requests": self.requests,
+            "exceptions": self.exceptions,
+            "timeouts": self.timeouts,
+            "duration": round(self.duration, 3),
+            "ranges": {k: [f"{a}-{b}" if a != b else str(a) for a, b in self.ranges(k)] for k in self.kinds},
+            "unanswered": self.unanswered,
+            "samples": {k: {str(a): v for a, v in sorted(self.values.get(k, {}).items())} for k in self.kinds},
+            "plan": self.plan,
+            "profile": self.profile,
+            "profile_path": self.profile_path,
+        }
+
+
+class _Prober:
+    """Przegląd jednego typu rejestru z podziałem binarnym bloków."""
+
+    def __init__(self, coordinator, result: DiscoveryResult, kind: str) -> None:
+        self._coordinator = coordinator
+        self._result = result
+        self._kind = kind
+        self._values = result.values.setdefault(kind, {})
+
+    async def probe(self, start: int, count: int) -> None:
+        for attempt in range(1, PROBE_ATTEMPTS + 1):
+            self._result.requests += 1
+            try:
+                regs = await self._coordinator.read_kind(self._kind, start, count, per_target=False)
+            except CircuitOpenError:
+                raise  # urządzenie niedostępne – przerwij cały przegląd
+            except ModbusError:
+                self._result.exceptions += 1
+                break
+            except Exception as err:
+                self._result.timeouts += 1
+                _LOGGER.debug(
+                    "EnsolarX: wykrywanie %s[%s-%s] próba %s bez odpowiedzi: %s",
+                    self._kind, start, start + count - 1, attempt, err,
+                )
+                if attempt == PROBE_ATTEMPTS:
+                    self._result.unanswered.append(f"{self._kind}[{start}-{start + count - 1}]")
+                    return
+                continue
+            if len(regs) >= count:
+                self._values.update(zip(range(start, start + count), regs))
+                return
+            break
+        if count == 1:
+            return
+        half = count // 2
+        await asyncio.gather(self.probe(start, half), self.probe(start + half, count - half))
+
+
+def suggest_profile(
+    result: DiscoveryResult, defs: Sequence[Dict[str, Any]], unit_id: Any
+) -> Dict[str, Any] | None:
+    """Profil z czytelnych adresów: znane definicje z poprawionym typem + nowe rejestry.
+
+    Nowe adresy (spoza ``defs``) z wartością 0 są pomijane – zwykle to rejestry
+    zarezerwowane. Grupa z nowymi rejestrami jest domyślnie wyłączona.
+    """
+    holding = result.values.get("holding", {})
+    inputs = result.values.get("input", {})
+    known: List[Dict[str, Any]] = []
+    covered: set = set()
+    for d in sorted(defs, key=lambda x: int(x["address"])):
+        addrs = range(int(d["address"]), int(d["address"]) + register_count(d))
+        declared = register_kind(d)
+        other = "input" if declared == "holding" else "holding"
+        for kind in (declared, other):
+            if all(a in result.values.get(kind, {}) for a in addrs):
+                # grupa i odświeżane grupy dotyczą profilu źródłowego
+                entry = {k: v for k, v in d.items() if k not in ("input_type", "group", "refresh")}
+                if kind == "input":
+                    entry["input_type"] = "input"
+                known.append(entry)
+                covered.update(addrs)
+                break
+
+    discovered: List[Dict[str, Any]] = []
+    for addr in sorted(set(holding) | set(inputs)):
+        if addr in covered or not (holding.get(addr) or inputs.get(addr)):
+            continue
+        d: Dict[str, Any] = {"name": f"Rejestr {addr}", "address": addr, "data_type": "uint16", "tier": "slow"}
+        if addr not in holding:
+            d["input_type"] = "input"
+        discovered.append(d)
+
+    groups = []
+    if known:
+        groups.append({"id": "known", "name": "Znane rejestry", "default": True, "registers": known})
+    if discovered:
+        groups.append({"id": "discovered", "name": "Wykryte rejestry", "default": False, "registers": discovered})
+    if not groups:
+        return None
+    return {
+        "version": PROFILE_FORMAT_VERSION,
+        "name": f"Wykryty profil (unit {unit_id}, {result.first}-{result.last})",
+        "groups": groups,
+    }
+
+
+async def async_discover(
+    hass: HomeAssistant,
+    coordinator,
+    first: int,
+    last: int,
+    kinds: Sequence[str] = REGISTER_KINDS,
+    block_size: int = MODBUS_MAX_READ_REGISTERS,
+    path_prefix: str | None = None,
+) -> DiscoveryResult:
+    """Przejrzyj adresy ``first``–``last`` i zbuduj sugerowany profil.
+
+    Regularne odpytywanie jest wstrzymane, a przegląd trzyma blokadę wpisu (bez
+    przeplatania z cyklem i zapisami). Typy rejestrów znanych definicji trafiają
+    do nauczonej mapy koordynatora. ``path_prefix`` – zapis profilu do
+    ``<path_prefix>.json`` (None – tylko wynik).
+    """
+    if last < first or last - first + 1 > MAX_DISCOVERY_SPAN:
+        raise ValueError(f"Zakres {first}-{last} poza limitem {MAX_DISCOVERY_SPAN} rejestrów")
+    block_size = max(1, min(int(block_size), MODBUS_MAX_READ_REGISTERS))
+    result = DiscoveryResult(first, last, tuple(kinds))
+    loop = asyncio.get_running_loop()
+    _LOGGER.info(
+        "EnsolarX: wykrywanie rejestrów %s-%s (%s, bloki po %s)", first, last, "/".join(kinds), block_size
+    )
+
+    with coordinator.pause_polling():
+        async with coordinator.lock:
+            started = loop.time()
+            await asyncio.gather(
+                *(
+                    _Prober(coordinator, result, kind).probe(start, min(block_size, last - start + 1))
+                    for kind in kinds
+                    for start in range(first, last + 1, block_size)
+                )
+            )
+            result.duration = loop.time() - started
+
+    defs = coordinator.defs
+    for d in defs:
+        addr = int(d["address"])
+        declared = register_kind(d)
+        for kind in (declared, "input" if declared == "holding" else "holding"):
+            if addr in result.values.get(kind, {}):
+                coordinator.register_map.learn(addr, kind)
+                break
+
+    unit_id = getattr(coordinator.client, "unit_id", "x")
+    result.profile = suggest_profile(result, defs, unit_id)
+    if result.profile is not None:
+        try:
+            profile = compile_profile("discovered", result.profile, "discovery")
+        except ProfileError as err:
+            _LOGGER.warning("EnsolarX: sugerowany profil niepoprawny: %s", err)
+            result.profile = None
+        else:
+            readable = {k: result.values.get(k, {}).keys() for k in REGISTER_KINDS}
+            blocks = plan_reads(
+                profile.defs(g.id for g in profile.groups),
+                barriers=lambda kind: set(range(first, last + 1)) - readable[kind],
+            )
+            result.plan = [str(b) for b in blocks]
+            if path_prefix:
+                result.profile_path = await hass.async_add_executor_job(
+                    _write_profile, f"{path_prefix}.json", result.profile
+                )
+    return result
+
+
+def _write_profile(path: str, profile: Dict[str, Any]) -> str:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+    return path
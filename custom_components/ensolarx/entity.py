@@ -0,0 +1,51 @@
+"""Wspólne elementy encji EnsolarX."""
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import EnsolarXCoordinator
+from .writer import RegisterWriteQueue
+
+
+def device_info(entry_id: str) -> DeviceInfo:
+    return DeviceInfo(
+        identifiers={(DOMAIN, entry_id)},
+        name="EnsolarX",
+        manufacturer="Endimac",
+        model="EnsolarX",
+    )
+
+
+class EnsolarXSettingEntity(CoordinatorEntity[EnsolarXCoordinator]):
+    """Ustawienie w rejestrze holding, zapisywane przez kolejkę zapisów wpisu."""
+
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: EnsolarXCoordinator,
+        writer: RegisterWriteQueue,
+        d: Dict[str, Any],
+        entry_id: str,
+    ) -> None:
+        super().__init__(coordinator)
+        self._def = d
+        self._writer = writer
+        self._attr_unique_id = f"{entry_id}_{d['address']}_{d['writable']}"
+        self._attr_name = d["name"]
+        self._attr_device_info = device_info(entry_id)
+
+    @property
+    def _value(self) -> Any:
+        return (self.coordinator.data or {}).get(self._def["name"])
+
+    async def _async_write(self, value: float) -> None:
+        try:
+            await self._writer.async_write_value(self._def, value)
+        except Exception as err:
+            raise HomeAssistantError(f"EnsolarX: nie udało się zapisać {self._def['name']}: {err}") from err
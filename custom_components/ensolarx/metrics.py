@@ -0,0 +1,159 @@
+"""Instrumentacja cykli odczytu EnsolarX (czasy, zapytania, bajty, błędy)."""
+from __future__ import annotations
+
+import bisect
+from typing import Any, Dict, List, Tuple
+
+# górne granice przedziałów histogramu opóźnień [ms]; ostatni przedział jest otwarty
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+MBAP_REQUEST_BYTES = 12  # MBAP (7) + FC, adres, liczba (5)
+MBAP_RESPONSE_OVERHEAD = 9  # MBAP (7) + FC, liczba bajtów (2)
+MBAP_EXCEPTION_BYTES = 9  # MBAP (7) + FC|0x80, kod (2)
+
+
+class LatencyHistogram:
+    """Histogram czasu odpowiedzi o stałych przedziałach (bez przechowywania próbek)."""
+
+    __slots__ = ("counts", "count", "total", "max", "errors")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total = 0.0  # s
+        self.max = 0.0  # s
+        self.errors = 0
+
+    def observe(self, seconds: float, ok: bool = True) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_MS, seconds * 1000)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if not ok:
+            self.errors += 1
+
+    def percentile(self, pct: float) -> float | None:
+        """Górna granica przedziału zawierającego percentyl [ms]; None bez próbek."""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else round(self.max * 1000, 1)
+        return round(self.max * 1000, 1)
+
+    def as_dict(self) -> Dict[str, Any]:
+        labels = [f"<={b}" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else None,
+            "max_ms": round(self.max * 1000, 2),
+            "total_ms": round(self.total * 1000, 1),
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "buckets_ms": {k: n for k, n in zip(labels, self.counts) if n},
+        }
+
+
+class CoordinatorMetrics:
+    """Liczniki koordynatora: bieżący cykl, ostatni zakończony cykl i sumy od startu.
+
+    Bajty są liczone z rozmiarów ramek Modbus TCP zapytań i odpowiedzi tego wpisu,
+    więc przy bramce współdzielonej przez kilka wpisów każdy widzi tylko swój ruch.
+    """
+
+    def __init__(self) -> None:
+        self.cycles = 0
+        self.failed_cycles = 0
+        self.overruns = 0
+        self.requests = 0
+        self.bytes = 0
+        self.retries = 0
+        self.fallbacks = 0
+        self.request_errors = 0
+        self.latency = LatencyHistogram()
+        # etykieta zapytania (blok "holding[1-40]" albo adres) -> histogram
+        self.by_target: Dict[str, LatencyHistogram] = {}
+        self.last_cycle: Dict[str, Any] = {}
+        self._cycle: Dict[str, int] = self._new_cycle()
+
+    @staticmethod
+    def _new_cycle() -> Dict[str, int]:
+        return {"requests": 0, "bytes": 0, "errors": 0, "retries": 0, "fallbacks": 0}
+
+    def begin_cycle(self) -> None:
+        self._cycle = self._new_cycle()
+
+    def end_cycle(self, duration: float, ok: bool, interval: float | None = None) -> None:
+        self.cycles += 1
+        if not ok:
+            self.failed_cycles += 1
+        overran = interval is not None and duration > interval
+        if overran:
+            self.overruns += 1
+        self.last_cycle = {
+            **self._cycle,
+            "duration_ms": round(duration * 1000, 1),
+            "ok": ok,
+            "overran": overran,
+        }
+
+    def observe_request(
+        self, target: str | None, count: int, seconds: float, ok: bool, answered: bool = True
+    ) -> None:
+        """Zapytanie o ``count`` rejestrów; ``answered`` – urządzenie odpowiedziało (także wyjątkiem).
+
+        ``target`` None – bez histogramu per cel (odczyty spoza planu odpytywania).
+        """
+        size = MBAP_REQUEST_BYTES
+        if ok:
+            size += MBAP_RESPONSE_OVERHEAD + 2 * count
+        elif answered:
+            size += MBAP_EXCEPTION_BYTES
+        self.requests += 1
+        self.bytes += size
+        self._cycle["requests"] += 1
+        self._cycle["bytes"] += size
+        if not ok:
+            self.request_errors += 1
+            self._cycle["errors"] += 1
+        self.latency.observe(seconds, ok)
+        if target is None:
+            return
+        hist = self.by_target.get(target)
+        if hist is None:
+            hist = self.by_target[target] = LatencyHistogram()
+        hist.observe(seconds, ok)
+
+    def retry(self) -> None:
+        self.retries += 1
+        self._cycle["retries"] += 1
+
+    def fallback(self) -> None:
+        self.fallbacks += 1
+        self._cycle["fallbacks"] += 1
+
+    def costliest(self, limit: int = 10) -> List[Tuple[str, float]]:
+        """Cele zapytań o największym łącznym czasie magistrali [ms]."""
+        ranked = sorted(self.by_target.items(), key=lambda kv: kv[1].total, reverse=True)
+        return [(k, round(h.total * 1000, 1)) for k, h in ranked[:limit]]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "overruns": self.overruns,
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "request_errors": self.request_errors,
+            "retries": self.retries,
+            "fallbacks": self.fallbacks,
+            "last_cycle": self.last_cycle,
+            "latency": self.latency.as_dict(),
+            "costliest_ms": dict(self.costliest()),
+            "by_target": {k: h.as_dict() for k, h in sorted(self.by_target.items())},
+        }
@@ -1,79 +1,588 @@
 from __future__ import annotations
-import asyncio, struct, logging
-from typing import List
+import asyncio, struct, logging, sys, time
+from array import array
+from collections import deque
+from itertools import chain
+from typing import Callable, Deque, Dict, List, Sequence, Tuple
 
 _LOGGER = logging.getLogger(__name__)
 
+MBAP_LEN = 7
+MAX_PDU_LEN = 253
+MAX_WRITE_REGISTERS = 123
+# bufor odbiorczy na kilka pełnych ramek – przydzielany raz na połączenie
+RECV_BUFFER_SIZE = 8 * (MBAP_LEN + MAX_PDU_LEN)
+
+_MBAP = struct.Struct(">HHHB")
+_REQUEST_PDU = struct.Struct(">BHH")  # FC 1/3/4/6: funkcja, adres, liczba/wartość
+_WRITE_MULTI_PDU = struct.Struct(">BHHB")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+# bajt -> 8 bitów (najmłodszy pierwszy) dla FC 1
+_BITS: Tuple[Tuple[bool, ...], ...] = tuple(
+    tuple(bool(b >> i & 1) for i in range(8)) for b in range(256)
+)
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+# kody wyjątków Modbus oznaczające, że urządzenie nie obsługuje adresu / funkcji
+ILLEGAL_FUNCTION = 1
+ILLEGAL_DATA_ADDRESS = 2
+
+
 class ModbusError(Exception):
+    def __init__(self, message: str, code: int | None = None) -> None:
+        super().__init__(message)
+        # kod wyjątku z odpowiedzi urządzenia (None – inny błąd protokołu)
+        self.code = code
+
+    @property
+    def illegal_address(self) -> bool:
+        """Urządzenie odrzuca adres lub funkcję – błąd trwały, nie chwilowy (kody 4/5/6)."""
+        return self.code in (ILLEGAL_FUNCTION, ILLEGAL_DATA_ADDRESS)
+
+class ModbusConnectionError(ConnectionError):
     pass
 
+class CircuitOpenError(ModbusConnectionError):
+    """Urządzenie uznane za nieosiągalne – zapytanie odrzucone bez wysyłania."""
+
+
+class _CircuitBreaker:
+    """Wyłącznik jednego urządzenia (unit ID) z wykładniczym backoffem."""
+
+    __slots__ = ("label", "threshold", "backoff_initial", "backoff_max", "backoff",
+                 "failures", "state", "open_until", "_probe")
+
+    def __init__(self, label: str, threshold: int, backoff_initial: float, backoff_max: float) -> None:
+        self.label = label
+        self.threshold = max(1, int(threshold))
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.backoff = backoff_initial
+        self.failures = 0
+        self.state = BREAKER_CLOSED
+        self.open_until = 0.0
+        # wynik zapytania-sondy, na który czekają pozostałe zapytania (HALF_OPEN)
+        self._probe: asyncio.Future | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == BREAKER_OPEN and time.monotonic() < self.open_until
+
+    async def check(self) -> None:
+        while True:
+            if self.state == BREAKER_CLOSED:
+                return
+            if self.state == BREAKER_OPEN and time.monotonic() >= self.open_until:
+                # to zapytanie jest sondą; pozostałe czekają na jej wynik
+                self.state = BREAKER_HALF_OPEN
+                self._probe = asyncio.get_running_loop().create_future()
+                return
+            if self.state == BREAKER_HALF_OPEN and self._probe is not None:
+                # po sondzie: zamknięty obwód – wysyłamy, ponowne otwarcie – odrzucamy
+                await asyncio.shield(self._probe)
+                continue
+            raise CircuitOpenError(
+                f"Modbus device {self.label} unreachable "
+                f"(circuit {self.state}, retry in {max(0.0, self.open_until - time.monotonic()):.1f}s)"
+            )
+
+    def _probe_finished(self) -> None:
+        probe, self._probe = self._probe, None
+        if probe is not None and not probe.done():
+            probe.set_result(None)
+
+    def success(self) -> None:
+        if self.state != BREAKER_CLOSED:
+            _LOGGER.info("Modbus TCP %s reachable again, circuit closed", self.label)
+        self.failures = 0
+        self.backoff = self.backoff_initial
+        self.state = BREAKER_CLOSED
+        self._probe_finished()
+
+    def failure(self) -> None:
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or (
+            self.state == BREAKER_CLOSED and self.failures >= self.threshold
+        ):
+            self.state = BREAKER_OPEN
+            self.open_until = time.monotonic() + self.backoff
+            _LOGGER.warning(
+                "Modbus TCP %s unreachable after %s failures, circuit open for %.1fs",
+                self.label, self.failures, self.backoff,
+            )
+            self.backoff = min(self.backoff * 2, self.backoff_max)
+        self._probe_finished()
+
+    def aborted(self) -> None:
+        if self.state == BREAKER_HALF_OPEN:
+            # przerwana sonda – następne zapytanie spróbuje ponownie
+            self.state = BREAKER_OPEN
+            self._probe_finished()
+
+
+class _FairSlots:
+    """Miejsca na zapytania w locie przydzielane po kolei (round-robin) między unit ID.
+
+    Gdy kilka urządzeń dzieli gniazdo, wolne miejsce dostaje kolejka następnego
+    urządzenia – żaden wpis z dużą mapą rejestrów nie zagłodzi pozostałych.
+    """
+
+    def __init__(self, slots: int) -> None:
+        self._free = slots
+        self._queues: Dict[int, Deque[asyncio.Future]] = {}
+        self._order: Deque[int] = deque()
+
+    async def acquire(self, unit: int) -> None:
+        if self._free > 0 and not self._order:
+            self._free -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(unit, deque())
+        if not queue:
+            self._order.append(unit)
+        queue.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # miejsce przydzielone tuż przed anulowaniem
+            else:
+                # release() mógł już zdjąć anulowaną przyszłość z kolejki
+                if fut in queue:
+                    queue.remove(fut)
+                if not queue and unit in self._order:
+                    self._order.remove(unit)
+            raise
+
+    def release(self) -> None:
+        while self._order:
+            unit = self._order.popleft()
+            queue = self._queues[unit]
+            fut = queue.popleft()
+            if queue:
+                self._order.append(unit)
+            if not fut.done():
+                fut.set_result(None)
+                return
+        self._free += 1
+
+
 class ModbusTcpClient:
-    def __init__(self, host: str, port: int, unit_id: int = 1, timeout: float = 3.0) -> None:
+    """Klient Modbus TCP z potokowaniem zapytań (wiele transakcji w locie na jednym gnieździe).
+
+    Odpowiedzi są odbierane do stałego bufora (``_ModbusProtocol``) i rozdzielane po
+    identyfikatorze transakcji (TID); odczyty rejestrów zwracają ``array('H')``. Ramki spóźnione (po timeoucie) lub niepasujące są odrzucane i zliczane w ``stale_frames``.
+    ``max_in_flight=1`` to tryb ścisły: jedno zapytanie naraz, jak w klasycznych bramkach.
+
+    Po błędzie I/O gniazdo jest porzucane i odtwarzane przy kolejnym zapytaniu. Po
+    ``breaker_threshold`` kolejnych porażkach (timeout / błąd połączenia) obwód się otwiera
+    i zapytania są odrzucane natychmiast (``CircuitOpenError``) przez czas rosnący
+    wykładniczo od ``backoff_initial`` do ``backoff_max``; potem jedno zapytanie-sonda
+    decyduje o zamknięciu obwodu lub kolejnym, dłuższym otwarciu.
+
+    Jedno gniazdo może obsługiwać kilka urządzeń za bramką: metody odczytu przyjmują
+    ``unit`` (domyślnie ``unit_id``), a wyłącznik i kolejka zapytań są prowadzone osobno
+    dla każdego unit ID (zob. ``ModbusUnitClient``).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        unit_id: int = 1,
+        timeout: float = 3.0,
+        max_in_flight: int = 1,
+        breaker_threshold: int = 3,
+        backoff_initial: float = 2.0,
+        backoff_max: float = 120.0,
+    ) -> None:
         self._host = host
         self._port = port
         self._unit = unit_id
         self._timeout = timeout
-        self._reader = None
-        self._writer = None
+        self._max_in_flight = max(1, int(max_in_flight))
+        self._transport: asyncio.Transport | None = None
+        self._protocol: _ModbusProtocol | None = None
         self._tid = 0
+        # TID -> (future, unit ID, kod funkcji, parser PDU odpowiedzi)
+        self._pending: Dict[int, Tuple[asyncio.Future, int, int, Callable[[memoryview], object]]] = {}
+        self._slots = _FairSlots(self._max_in_flight)
+        self._connect_lock = asyncio.Lock()
+        self.stale_frames = 0
+        self.reconnects = 0
+        self._connected_once = False
+
+        self._breaker_args = (breaker_threshold, backoff_initial, backoff_max)
+        self._breakers: Dict[int, _CircuitBreaker] = {}
+
+    @property
+    def host(self) -> str:
+        return self._host
+
+    @property
+    def port(self) -> int:
+        return self._port
+
+    @property
+    def unit_id(self) -> int:
+        return self._unit
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    @property
+    def connected(self) -> bool:
+        return self._transport is not None and not self._transport.is_closing()
+
+    def breaker(self, unit: int | None = None) -> _CircuitBreaker:
+        unit = self._unit if unit is None else unit
+        breaker = self._breakers.get(unit)
+        if breaker is None:
+            breaker = _CircuitBreaker(f"{self._host}:{self._port}/{unit}", *self._breaker_args)
+            self._breakers[unit] = breaker
+        return breaker
+
+    @property
+    def breaker_state(self) -> str:
+        return self.breaker().state
+
+    @property
+    def circuit_open(self) -> bool:
+        """True, dopóki obwód jest otwarty i nie nadszedł czas na zapytanie-sondę."""
+        return self.breaker().is_open
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self.breaker().failures
 
     async def connect(self) -> None:
-        if self._writer:
-            return
-        _LOGGER.debug("Connecting Modbus TCP to %s:%s (unit=%s)", self._host, self._port, self._unit)
-        self._reader, self._writer = await asyncio.wait_for(
-            asyncio.open_connection(self._host, self._port), timeout=self._timeout
-        )
+        async with self._connect_lock:
+            if self._transport is not None:
+                return
+            _LOGGER.debug("Connecting Modbus TCP to %s:%s", self._host, self._port)
+            loop = asyncio.get_running_loop()
+            try:
+                transport, protocol = await asyncio.wait_for(
+                    loop.create_connection(lambda: _ModbusProtocol(self), self._host, self._port),
+                    timeout=self._timeout,
+                )
+            except (OSError, asyncio.TimeoutError) as err:
+                raise ModbusConnectionError(
+                    f"Cannot connect to {self._host}:{self._port}: {err!r}"
+                ) from err
+            if self._connected_once:
+                self.reconnects += 1
+            self._connected_once = True
+            self._transport = transport
+            self._protocol = protocol
 
     async def close(self) -> None:
-        if self._writer:
-            self._writer.close()
+        if self._transport is not None:
+            self._transport.close()
+        self._transport = None
+        self._protocol = None
+        self._fail_pending(ConnectionError("Modbus connection closed"))
+
+    def _fail_pending(self, err: Exception) -> None:
+        pending, self._pending = self._pending, {}
+        for fut, _, _, _ in pending.values():
+            if not fut.done():
+                fut.set_exception(err)
+
+    def _drop_connection(self, err: Exception, protocol: _ModbusProtocol | None = None) -> None:
+        """Porzuć gniazdo po błędzie I/O; kolejne zapytanie połączy się od nowa."""
+        if protocol is not None and protocol is not self._protocol:
+            return  # gniazdo już wymienione przez inne zapytanie
+        if self._transport is not None:
+            self._transport.abort()
+        self._transport = None
+        self._protocol = None
+        self._fail_pending(err)
+
+    def _connection_lost(self, protocol: _ModbusProtocol, err: Exception) -> None:
+        if protocol is self._protocol:
+            _LOGGER.debug("Modbus TCP reader stopped: %s", err)
+            self._drop_connection(err, protocol)
+
+    def _dispatch(self, tid: int, unit: int, pdu: memoryview) -> None:
+        """Przekaż PDU z bufora odbiorczego oczekującemu zapytaniu (parsowanie w miejscu)."""
+        entry = self._pending.get(tid)
+        if entry is None or entry[0].done() or unit != entry[1]:
+            self.stale_frames += 1
+            _LOGGER.debug("Dropping stale Modbus frame tid=%s unit=%s", tid, unit)
+            return
+        del self._pending[tid]
+        fut, _, fc, parse = entry
+        # odpowiedź wyjątkiem to wynik (urządzenie odpowiedziało), zgłaszany w _send_pdu
+        if pdu[0] & 0x80:
+            code = pdu[1] if len(pdu) > 1 else 0
+            fut.set_result(
+                ModbusError(f"Exception from device (function={pdu[0]&0x7F}, code={code})", code)
+            )
+        elif pdu[0] != fc:
+            fut.set_result(
+                ModbusError(f"Unexpected function in response: {bytes(pdu[:1]).hex()} (expected {fc})")
+            )
+        else:
             try:
-                await self._writer.wait_closed()
-            except Exception:
-                pass
-        self._reader = None
-        self._writer = None
-
-    async def _send_pdu(self, pdu: bytes) -> bytes:
-        if not self._writer or not self._reader:
-            await self.connect()
-        self._tid = (self._tid + 1) & 0xFFFF
-        length = len(pdu) + 1  # + unit
-        mbap = struct.pack(">HHHB", self._tid, 0, length, self._unit)
-        self._writer.write(mbap + pdu)
-        await self._writer.drain()
-
-        hdr = await asyncio.wait_for(self._reader.readexactly(7), timeout=self._timeout)
-        tid, _, length, unit = struct.unpack(">HHHB", hdr)
-        pdu_len = length - 1
-        data = await asyncio.wait_for(self._reader.readexactly(pdu_len), timeout=self._timeout)
-        if data and (data[0] & 0x80):
-            code = data[1] if len(data) > 1 else 0
-            raise ModbusError(f"Exception from device (function={data[0]&0x7F}, code={code})")
-        return data
+                fut.set_result(parse(pdu))
+            except (IndexError, ValueError, struct.error) as err:
+                fut.set_result(ModbusError(f"Malformed FC {fc} response: {err}"))
 
-    async def read_coils(self, address: int, count: int) -> List[bool]:
-        pdu = struct.pack(">BHH", 1, address, count)
-        data = await self._send_pdu(pdu)
-        byte_count = data[1]
-        raw = data[2:2+byte_count]
-        bits = []
-        for i in range(count):
-            b = raw[i // 8]
-            bits.append(bool((b >> (i % 8)) & 1))
+    def _next_tid(self) -> int:
+        while True:
+            self._tid = (self._tid + 1) & 0xFFFF
+            if self._tid not in self._pending:
+                return self._tid
+
+    async def _transact(self, frame: bytearray, unit: int, fc: int, parse: Callable[[memoryview], object]) -> object:
+        await self._slots.acquire(unit)
+        try:
+            if self._transport is None:
+                await self.connect()
+            tid = self._next_tid()
+            loop = asyncio.get_running_loop()
+            fut = loop.create_future()
+            self._pending[tid] = (fut, unit, fc, parse)
+            # nagłówek MBAP wpisany w zarezerwowane miejsce ramki – bez sklejania bajtów
+            _MBAP.pack_into(frame, 0, tid, 0, len(frame) - MBAP_LEN + 1, unit)
+            protocol = self._protocol
+            timer = loop.call_later(self._timeout, _expire, fut)
+            try:
+                self._transport.write(frame)
+                return await fut
+            except asyncio.TimeoutError:
+                raise  # TimeoutError dziedziczy po OSError – gniazdo zostaje
+            except (OSError, ConnectionError) as err:
+                self._drop_connection(err, protocol)
+                raise
+            finally:
+                timer.cancel()
+                # po timeoucie spóźniona odpowiedź trafi do stale_frames
+                self._pending.pop(tid, None)
+        finally:
+            self._slots.release()
+
+    async def _send_pdu(
+        self, frame: bytearray, parse: Callable[[memoryview], object], unit: int | None = None
+    ) -> object:
+        """Wyślij ramkę (PDU od ``MBAP_LEN``) i zwróć wynik ``parse`` dla odpowiedzi."""
+        unit = self._unit if unit is None else unit
+        breaker = self.breaker(unit)
+        await breaker.check()
+        try:
+            result = await self._transact(frame, unit, frame[MBAP_LEN], parse)
+        except asyncio.TimeoutError:
+            breaker.failure()
+            if breaker.failures >= 2:
+                # kolejne timeouty – sesja TCP prawdopodobnie martwa po stronie bramki
+                self._drop_connection(ModbusConnectionError("Modbus session timed out"))
+            raise
+        except (OSError, ConnectionError):
+            breaker.failure()
+            raise
+        except BaseException:
+            breaker.aborted()
+            raise
+        breaker.success()
+        if isinstance(result, ModbusError):
+            raise result
+        return result
+
+    async def read_coils(self, address: int, count: int, unit: int | None = None) -> List[bool]:
+        bits = await self._send_pdu(_request(1, address, count), _parse_coils, unit)
+        del bits[count:]
         return bits
 
-    async def read_holding_registers(self, address: int, count: int) -> List[int]:
-        pdu = struct.pack(">BHH", 3, address, count)
-        data = await self._send_pdu(pdu)
-        byte_count = data[1]
-        regs = list(struct.unpack(f">{byte_count//2}H", data[2:2+byte_count]))
-        return regs
-
-    async def read_input_registers(self, address: int, count: int) -> List[int]:
-        pdu = struct.pack(">BHH", 4, address, count)
-        data = await self._send_pdu(pdu)
-        byte_count = data[1]
-        regs = list(struct.unpack(f">{byte_count//2}H", data[2:2+byte_count]))
-        return regs
+    async def read_holding_registers(self, address: int, count: int, unit: int | None = None) -> array:
+        return await self._send_pdu(_request(3, address, count), _parse_registers, unit)
+
+    async def read_input_registers(self, address: int, count: int, unit: int | None = None) -> array:
+        return await self._send_pdu(_request(4, address, count), _parse_registers, unit)
+
+    async def write_register(self, address: int, value: int, unit: int | None = None) -> None:
+        """FC 6 – zapis jednego rejestru holding; odpowiedź musi być echem zapytania."""
+        frame = _request(6, address, value & 0xFFFF)
+        data = await self._send_pdu(frame, _parse_echo, unit)
+        if data[:5] != frame[MBAP_LEN:]:
+            raise ModbusError(f"Unexpected FC 6 response: {data.hex()} (expected {frame[MBAP_LEN:].hex()})")
+
+    async def write_registers(self, address: int, values: Sequence[int], unit: int | None = None) -> None:
+        """FC 16 – zapis ciągłego zakresu rejestrów holding."""
+        count = len(values)
+        if not 1 <= count <= MAX_WRITE_REGISTERS:
+            raise ValueError(f"FC 16 supports 1..{MAX_WRITE_REGISTERS} registers, got {count}")
+        regs = array("H", (v & 0xFFFF for v in values))
+        if _LITTLE_ENDIAN:
+            regs.byteswap()
+        offset = MBAP_LEN + _WRITE_MULTI_PDU.size
+        frame = bytearray(offset + count * 2)
+        _WRITE_MULTI_PDU.pack_into(frame, MBAP_LEN, 16, address, count, count * 2)
+        frame[offset:] = regs.tobytes()
+        data = await self._send_pdu(frame, _parse_echo, unit)
+        if len(data) < 5 or struct.unpack_from(">HH", data, 1) != (address, count):
+            raise ModbusError(f"Unexpected FC 16 response: {data.hex()} (expected {address}+{count})")
+
+
+def _expire(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_exception(asyncio.TimeoutError())
+
+
+def _request(fc: int, address: int, value: int) -> bytearray:
+    """Ramka FC 1/3/4/6 z miejscem na nagłówek MBAP (uzupełniany w ``_transact``)."""
+    frame = bytearray(MBAP_LEN + _REQUEST_PDU.size)
+    _REQUEST_PDU.pack_into(frame, MBAP_LEN, fc, address, value)
+    return frame
+
+
+def _parse_registers(pdu: memoryview) -> array:
+    """FC 3/4: rejestry jako ``array('H')`` w kolejności natywnej – jedna kopia z bufora."""
+    size = min(pdu[1], len(pdu) - 2) & ~1
+    regs = array("H")
+    regs.frombytes(pdu[2:2 + size])
+    if _LITTLE_ENDIAN:
+        regs.byteswap()
+    return regs
+
+
+def _parse_coils(pdu: memoryview) -> List[bool]:
+    """FC 1: bity z tablicy bajt -> 8 bitów (długość dopełniona do pełnych bajtów)."""
+    return list(chain.from_iterable(map(_BITS.__getitem__, pdu[2:2 + pdu[1]])))
+
+
+def _parse_echo(pdu: memoryview) -> bytes:
+    return bytes(pdu)
+
+
+class _ModbusProtocol(asyncio.BufferedProtocol):
+    """Odbiór ramek Modbus TCP do stałego bufora i rozdzielanie ich po TID.
+
+    Pętla zdarzeń zapisuje dane bezpośrednio do bufora (``get_buffer``); kompletne
+    ramki są parsowane w miejscu przez ``memoryview`` i ``unpack_from``, a niepełna
+    końcówka jest przesuwana na początek bufora dopiero, gdy kończy się miejsce.
+    """
+
+    def __init__(self, client: ModbusTcpClient) -> None:
+        self._client = client
+        self._buf = bytearray(RECV_BUFFER_SIZE)
+        self._view = memoryview(self._buf)
+        self._start = 0  # początek nieprzetworzonych danych
+        self._end = 0  # koniec odebranych danych
+        self._transport: asyncio.Transport | None = None
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        self._transport = transport  # type: ignore[assignment]
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if len(self._buf) - self._end < MBAP_LEN + MAX_PDU_LEN and self._start:
+            tail = bytes(self._view[self._start:self._end])  # < jedna ramka
+            self._buf[:len(tail)] = tail
+            self._start, self._end = 0, len(tail)
+        return self._view[self._end:]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        self._end += nbytes
+        view = self._view
+        start, end = self._start, self._end
+        while end - start >= MBAP_LEN:
+            tid, proto, length, unit = _MBAP.unpack_from(view, start)
+            if proto != 0 or not 2 <= length <= MAX_PDU_LEN + 1:
+                self._start = self._end = 0
+                self._client._connection_lost(
+                    self, ConnectionError(f"Invalid MBAP header (proto={proto}, length={length})")
+                )
+                if self._transport is not None:
+                    self._transport.abort()
+                return
+            frame_end = start + MBAP_LEN - 1 + length
+            if frame_end > end:
+                break
+            self._client._dispatch(tid, unit, view[start + MBAP_LEN:frame_end])
+            start = frame_end
+        if start == end:
+            start = end = 0
+        self._start, self._end = start, end
+
+    def eof_received(self) -> bool:
+        return False
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        self._client._connection_lost(self, ConnectionError(f"Modbus connection lost: {exc or 'EOF'}"))
+
+
+class ModbusUnitClient:
+    """Klient jednego urządzenia (unit ID) na współdzielonym połączeniu z bramką.
+
+    Ma ten sam interfejs odczytu co ``ModbusTcpClient``; ``close()`` jest no-op –
+    połączeniem zarządza pula (``connection_pool``).
+    """
+
+    def __init__(self, connection: ModbusTcpClient, unit_id: int) -> None:
+        self.connection = connection
+        self._unit = unit_id
+
+    @property
+    def host(self) -> str:
+        return self.connection.host
+
+    @property
+    def port(self) -> int:
+        return self.connection.port
+
+    @property
+    def unit_id(self) -> int:
+        return self._unit
+
+    @property
+    def max_in_flight(self) -> int:
+        return self.connection.max_in_flight
+
+    @property
+    def connected(self) -> bool:
+        return self.connection.connected
+
+    @property
+    def stale_frames(self) -> int:
+        return self.connection.stale_frames
+
+    @property
+    def reconnects(self) -> int:
+        return self.connection.reconnects
+
+    @property
+    def breaker_state(self) -> str:
+        return self.connection.breaker(self._unit).state
+
+    @property
+    def circuit_open(self) -> bool:
+        return self.connection.breaker(self._unit).is_open
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self.connection.breaker(self._unit).failures
+
+    async def connect(self) -> None:
+        await self.connection.connect()
+
+    async def close(self) -> None:
+        pass
+
+    async def read_coils(self, address: int, count: int) -> List[bool]:
+        return await self.connection.read_coils(address, count, self._unit)
+
+    async def read_holding_registers(self, address: int, count: int) -> array:
+        return await self.connection.read_holding_registers(address, count, self._unit)
+
+    async def read_input_registers(self, address: int, count: int) -> array:
+        return await self.connection.read_input_registers(address, count, self._unit)
+
+    async def write_register(self, address: int, value: int) -> None:
+        await self.connection.write_register(address, value, self._unit)
+
+    async def write_registers(self, address: int, values: Sequence[int]) -> None:
+        await self.connection.write_registers(address, values, self._unit)
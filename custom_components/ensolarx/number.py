@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from homeassistant.components.number import NumberEntity, NumberMode
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .entity import EnsolarXSettingEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    entities: List[EnsolarXNumber] = [
+        EnsolarXNumber(coordinator, data["writer"], d, entry.entry_id)
+        for d in coordinator.defs
+        if d.get("writable") == "number"
+    ]
+    async_add_entities(entities)
+
+
+class EnsolarXNumber(EnsolarXSettingEntity, NumberEntity):
+    """Nastawa liczbowa (np. napięcia powrotu) zapisywana w rejestrze holding."""
+
+    _attr_entity_category = EntityCategory.CONFIG
+    _attr_mode = NumberMode.BOX
+
+    def __init__(self, coordinator, writer, d: Dict[str, Any], entry_id: str) -> None:
+        super().__init__(coordinator, writer, d, entry_id)
+        scale = float(d.get("scale", 1.0))
+        self._attr_native_unit_of_measurement = d.get("unit")
+        self._attr_native_min_value = float(d.get("min", 0))
+        self._attr_native_max_value = float(d.get("max", 0xFFFF * scale))
+        self._attr_native_step = float(d.get("step", scale))
+
+    @property
+    def native_value(self) -> float | None:
+        return self._value
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self._async_write(value)
@@ -0,0 +1,40 @@
+"""Trwały stan wpisu EnsolarX w magazynie HA."""
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_VERSION = 1
+
+
+def entry_store(hass: HomeAssistant, entry_id: str, name: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.{name}")
+
+
+class ThrottledSave:
+    """Zapis stanu zmieniającego się co cykl najwyżej raz na ``interval`` sekund.
+
+    ``Store.async_delay_save`` przesuwa termin przy każdym wywołaniu, więc przy
+    zmianach częstszych niż opóźnienie stan trafiłby na dysk dopiero przy
+    zatrzymaniu HA – po awarii lub odcięciu zasilania przepadłby cały okres pracy.
+    Tu termin jest stały od pierwszej zmiany; zapisywany jest najnowszy stan.
+    """
+
+    def __init__(self, store: Store | None, data_func: Callable[[], Dict[str, Any]], interval: float) -> None:
+        self._store = store
+        self._data_func = data_func
+        self._interval = interval
+        self._due: float | None = None
+
+    def schedule(self) -> None:
+        if self._store is None:
+            return
+        now = time.monotonic()
+        if self._due is None or now >= self._due:
+            self._due = now + self._interval
+        self._store.async_delay_save(self._data_func, self._due - now)
@@ -0,0 +1,104 @@
+"""Planowanie odczytów blokowych Modbus dla EnsolarX."""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import AbstractSet, Any, Callable, Dict, Iterable, List
+
+from .const import (
+    DEFAULT_MAX_BLOCK_SIZE,
+    DEFAULT_MAX_GAP,
+    DEFAULT_TIER,
+    MODBUS_MAX_READ_REGISTERS,
+    POLL_TIERS,
+)
+
+
+@dataclass
+class ReadBlock:
+    """Ciągły zakres rejestrów jednego typu odczytywany jednym zapytaniem."""
+
+    kind: str  # holding | input
+    start: int
+    count: int
+    defs: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def end(self) -> int:
+        """Ostatni adres objęty blokiem (włącznie)."""
+        return self.start + self.count - 1
+
+    def offset(self, d: Dict[str, Any]) -> int:
+        """Przesunięcie definicji względem początku bloku."""
+        return int(d["address"]) - self.start
+
+    def __str__(self) -> str:
+        return f"{self.kind}[{self.start}-{self.end}]"
+
+
+def data_type(d: Dict[str, Any]) -> str:
+    """Typ danych z definicji (obsługuje oba klucze: dtype / data_type)."""
+    return d.get("dtype") or d.get("data_type", "uint16")
+
+
+def register_count(d: Dict[str, Any]) -> int:
+    """Liczba 16-bitowych rejestrów zajmowanych przez definicję."""
+    return 1 if data_type(d) in ("uint16", "int16") else 2
+
+
+def register_kind(d: Dict[str, Any]) -> str:
+    """Deklarowany typ rejestru (holding | input)."""
+    return d.get("input_type", "holding")
+
+
+def poll_tier(d: Dict[str, Any]) -> str:
+    """Klasa częstotliwości odpytywania (fast | medium | slow)."""
+    tier = d.get("tier", DEFAULT_TIER)
+    return tier if tier in POLL_TIERS else DEFAULT_TIER
+
+
+def plan_reads(
+    defs: Iterable[Dict[str, Any]],
+    max_block_size: int = DEFAULT_MAX_BLOCK_SIZE,
+    max_gap: int = DEFAULT_MAX_GAP,
+    kind_of: Callable[[Dict[str, Any]], str] = register_kind,
+    barriers: Callable[[str], AbstractSet[int]] | None = None,
+) -> List[ReadBlock]:
+    """Pogrupuj definicje w ciągłe bloki odczytu.
+
+    Definicje są grupowane po typie rejestru (``kind_of``) i sortowane po adresie. Kolejna
+    definicja dołącza do bieżącego bloku, jeśli liczba nieużywanych rejestrów
+    pomiędzy nimi nie przekracza ``max_gap``, a blok nie urośnie ponad
+    ``max_block_size`` rejestrów. Przerwa nie może obejmować adresów zwróconych
+    przez ``barriers(kind)`` – np. znanych jako inny typ rejestru lub martwych.
+    """
+    max_block_size = max(1, min(int(max_block_size), MODBUS_MAX_READ_REGISTERS))
+    max_gap = max(0, int(max_gap))
+
+    by_kind: Dict[str, List[Dict[str, Any]]] = {}
+    for d in defs:
+        by_kind.setdefault(kind_of(d), []).append(d)
+
+    blocks: List[ReadBlock] = []
+    for kind in sorted(by_kind):
+        blocked = barriers(kind) if barriers else frozenset()
+        current: ReadBlock | None = None
+        for d in sorted(by_kind[kind], key=lambda x: int(x["address"])):
+            addr = int(d["address"])
+            count = register_count(d)
+            if current is not None:
+                gap = addr - current.end - 1
+                new_count = max(current.count, addr + count - current.start)
+                if (
+                    gap <= max_gap
+                    and new_count <= max_block_size
+                    and not any(a in blocked for a in range(current.end + 1, addr))
+                ):
+                    current.count = new_count
+                    current.defs.append(d)
+                    continue
+                blocks.append(current)
+            current = ReadBlock(kind=kind, start=addr, count=count, defs=[d])
+        if current is not None:
+            blocks.append(current)
+
+    return blocks
@@ -0,0 +1,269 @@
+"""Profile map rejestrów EnsolarX (per model / firmware) w plikach JSON lub YAML.
+
+Profile dołączone do integracji leżą w katalogu ``profiles/``, własne można
+dodać w ``<config>/ensolarx_profiles/`` (ten sam identyfikator nadpisuje
+profil wbudowany). Identyfikatorem profilu jest nazwa pliku bez rozszerzenia.
+
+Format (``version`` – wersja formatu pliku)::
+
+    {"version": 1, "name": "...", "model": "...",
+     "groups": [{"id": "pv", "name": "Panele PV", "default": true,
+                 "registers": [{"name": "...", "address": 1, ...}, ...]}]}
+
+Klucze definicji rejestru:
+  name, address, unit, data_type ("uint16" | "int16" | "uint32" | "float32"),
+  input_type ("holding" | "input"), scale (float), precision (int),
+  tier ("fast" | "medium" | "slow", domyślnie "medium"),
+  deadband (bezwzględna, w jednostce), deadband_rel (ułamek ostatnio zapisanej
+  wartości) – minimalna zmiana wywołująca zapis stanu (domyślnie: każda zmiana),
+  writable ("number" | "select") – rejestr holding ustawiany z HA (FC 6/16);
+  number: min, max, step (w jednostce); select: options (surowe kody),
+  daily_counter (bool) – licznik energii zerowany przez urządzenie o północy
+  (dostaje narastający sensor „Łącznie:” typu total_increasing),
+  watch (bool) – rejestr statusu czytany dodatkowo w szybkiej pętli obserwacji;
+  refresh – identyfikatory grup odczytywanych od razu po zmianie jego wartości
+
+Plik jest parsowany i walidowany raz; wynik (``RegisterProfile``) jest
+przechowywany w ``hass.data`` i współdzielony przez wpisy z tym profilem.
+"""
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+import voluptuous as vol
+import yaml
+
+from homeassistant.core import HomeAssistant
+
+from .const import DEFAULT_PROFILE, DOMAIN, POLL_TIERS
+from .decoder import DTYPE_CODES
+from .planner import register_count
+
+_LOGGER = logging.getLogger(__name__)
+
+PROFILE_FORMAT_VERSION = 1
+PROFILE_SUFFIXES = (".json", ".yaml", ".yml")
+BUNDLED_PROFILES_DIR = Path(__file__).parent / "profiles"
+USER_PROFILES_DIR = f"{DOMAIN}_profiles"
+# hass.data: identyfikator profilu -> RegisterProfile
+PROFILES_KEY = f"{DOMAIN}_profiles"
+
+_u16 = vol.All(int, vol.Range(min=0, max=0xFFFF))
+
+REGISTER_SCHEMA = vol.Schema(
+    {
+        vol.Required("name"): vol.All(str, vol.Length(min=1)),
+        vol.Required("address"): _u16,
+        vol.Optional("unit"): str,
+        vol.Optional("data_type"): vol.In(sorted(DTYPE_CODES)),
+        vol.Optional("input_type"): vol.In(["holding", "input"]),
+        vol.Optional("scale"): vol.Coerce(float),
+        vol.Optional("precision"): vol.All(int, vol.Range(min=0, max=6)),
+        vol.Optional("tier"): vol.In(list(POLL_TIERS)),
+        vol.Optional("deadband"): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional("deadband_rel"): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("writable"): vol.In(["number", "select"]),
+        vol.Optional("min"): vol.Coerce(float),
+        vol.Optional("max"): vol.Coerce(float),
+        vol.Optional("step"): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional("options"): vol.All([_u16], vol.Length(min=1)),
+        vol.Optional("daily_counter"): bool,
+        vol.Optional("watch"): bool,
+        vol.Optional("refresh"): [str],
+    }
+)
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Required("version"): vol.All(int, vol.Range(min=1, max=PROFILE_FORMAT_VERSION)),
+        vol.Required("name"): vol.All(str, vol.Length(min=1)),
+        vol.Optional("model"): str,
+        vol.Optional("firmware"): str,
+        vol.Optional("protocol"): str,
+        vol.Required("groups"): vol.All(
+            [
+                vol.Schema(
+                    {
+                        vol.Required("id"): vol.All(str, vol.Match(r"^[a-z0-9_]+$")),
+                        vol.Required("name"): vol.All(str, vol.Length(min=1)),
+                        vol.Optional("default", default=True): bool,
+                        vol.Required("registers"): [REGISTER_SCHEMA],
+                    }
+                )
+            ],
+            vol.Length(min=1),
+        ),
+    }
+)
+
+
+class ProfileError(Exception):
+    """Brak pliku profilu lub niepoprawna zawartość."""
+
+
+@dataclass(frozen=True)
+class ProfileGroup:
+    id: str
+    name: str
+    default: bool
+    defs: Tuple[Dict[str, Any], ...]
+
+
+@dataclass(frozen=True)
+class RegisterProfile:
+    """Zwalidowany profil: grupy rejestrów w kolejności z pliku."""
+
+    id: str
+    name: str
+    model: str | None
+    firmware: str | None
+    source: str
+    groups: Tuple[ProfileGroup, ...]
+
+    @property
+    def default_groups(self) -> List[str]:
+        return [g.id for g in self.groups if g.default]
+
+    @property
+    def group_names(self) -> Dict[str, str]:
+        return {g.id: g.name for g in self.groups}
+
+    def defs(self, groups: Iterable[str] | None = None) -> List[Dict[str, Any]]:
+        """Definicje rejestrów z wybranych grup (``None`` – grupy domyślne).
+
+        Zwracane są kopie z kluczem ``group`` (identyfikator grupy) – koordynator
+        i encje mogą je rozszerzać bez wpływu na cache.
+        """
+        wanted = set(self.default_groups if groups is None else groups)
+        return [{**d, "group": g.id} for g in self.groups if g.id in wanted for d in g.defs]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "model": self.model,
+            "firmware": self.firmware,
+            "source": self.source,
+            "groups": {g.id: len(g.defs) for g in self.groups},
+        }
+
+
+def _check_register(d: Dict[str, Any]) -> None:
+    if d.get("writable") and register_count(d) != 1:
+        raise vol.Invalid(f"{d['name']}: zapis obsługiwany tylko dla rejestrów 16-bitowych")
+    if d.get("writable") == "select" and "options" not in d:
+        raise vol.Invalid(f"{d['name']}: writable=select wymaga listy options")
+    if d.get("writable") == "number" and not ("min" in d and "max" in d and d["min"] < d["max"]):
+        raise vol.Invalid(f"{d['name']}: writable=number wymaga min < max")
+
+
+def compile_profile(profile_id: str, raw: Any, source: str = "") -> RegisterProfile:
+    """Zwaliduj surową zawartość pliku i zbuduj ``RegisterProfile``."""
+    try:
+        data = PROFILE_SCHEMA(raw)
+        names: set = set()
+        used: Dict[int, str] = {}
+        group_ids: set = set()
+        for group in data["groups"]:
+            if group["id"] in group_ids:
+                raise vol.Invalid(f"powtórzona grupa {group['id']}")
+            group_ids.add(group["id"])
+            for d in group["registers"]:
+                _check_register(d)
+                if d["name"] in names:
+                    raise vol.Invalid(f"powtórzona nazwa rejestru {d['name']}")
+                names.add(d["name"])
+                first = d["address"]
+                for addr in range(first, first + register_count(d)):
+                    if addr in used:
+                        raise vol.Invalid(f"{d['name']}: adres {addr} zajęty przez {used[addr]}")
+                    used[addr] = d["name"]
+        for group in data["groups"]:
+            for d in group["registers"]:
+                unknown = set(d.get("refresh", ())) - group_ids
+                if unknown:
+                    raise vol.Invalid(f"{d['name']}: nieznane grupy w refresh: {', '.join(sorted(unknown))}")
+    except vol.Invalid as err:
+        raise ProfileError(f"Profil {profile_id} ({source}): {err}") from err
+
+    return RegisterProfile(
+        id=profile_id,
+        name=data["name"],
+        model=data.get("model"),
+        firmware=data.get("firmware"),
+        source=source,
+        groups=tuple(
+            ProfileGroup(g["id"], g["name"], g["default"], tuple(g["registers"]))
+            for g in data["groups"]
+        ),
+    )
+
+
+def load_profile_file(path: Path) -> RegisterProfile:
+    """Wczytaj i skompiluj profil z pliku (operacja blokująca)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f) if path.suffix == ".json" else yaml.safe_load(f)
+    except (OSError, ValueError, yaml.YAMLError) as err:
+        raise ProfileError(f"Nie można wczytać profilu {path}: {err}") from err
+    return compile_profile(path.stem, raw, str(path))
+
+
+def _profile_paths(user_dir: Path | None) -> Dict[str, Path]:
+    paths: Dict[str, Path] = {}
+    for directory in (BUNDLED_PROFILES_DIR, user_dir):
+        if directory is None or not directory.is_dir():
+            continue
+        for path in sorted(directory.iterdir()):
+            if path.suffix in PROFILE_SUFFIXES:
+                paths[path.stem] = path
+    return paths
+
+
+@lru_cache(maxsize=None)
+def bundled_profile(profile_id: str = DEFAULT_PROFILE) -> RegisterProfile:
+    """Profil wbudowany bez instancji HA (benchmarki, symulator)."""
+    path = _profile_paths(None).get(profile_id)
+    if path is None:
+        raise ProfileError(f"Brak wbudowanego profilu {profile_id}")
+    return load_profile_file(path)
+
+
+def _user_dir(hass: HomeAssistant) -> Path:
+    return Path(hass.config.path(USER_PROFILES_DIR))
+
+
+async def async_get_profile(hass: HomeAssistant, profile_id: str) -> RegisterProfile:
+    """Profil o danym identyfikatorze – wczytywany przy pierwszym użyciu."""
+    cache: Dict[str, RegisterProfile] = hass.data.setdefault(PROFILES_KEY, {})
+    if profile_id not in cache:
+        paths = await hass.async_add_executor_job(_profile_paths, _user_dir(hass))
+        if profile_id not in paths:
+            raise ProfileError(f"Nieznany profil {profile_id}")
+        cache[profile_id] = await hass.async_add_executor_job(load_profile_file, paths[profile_id])
+        _LOGGER.debug(
+            "EnsolarX: wczytano profil %s z %s", profile_id, cache[profile_id].source
+        )
+    return cache[profile_id]
+
+
+async def async_list_profiles(hass: HomeAssistant) -> Dict[str, str]:
+    """Dostępne profile: identyfikator -> nazwa (niepoprawne pliki są pomijane)."""
+    paths = await hass.async_add_executor_job(_profile_paths, _user_dir(hass))
+    names: Dict[str, str] = {}
+    for profile_id in paths:
+        try:
+            names[profile_id] = (await async_get_profile(hass, profile_id)).name
+        except ProfileError as err:
+            _LOGGER.warning("EnsolarX: %s", err)
+    return names
+
+
+def async_clear_profile_cache(hass: HomeAssistant) -> None:
+    """Zapomnij wczytane profile (np. po edycji pliku i ponownym wczytaniu wpisu)."""
+    hass.data.pop(PROFILES_KEY, None)
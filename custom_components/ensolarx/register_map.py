@@ -0,0 +1,155 @@
+"""Nauczona mapa typów rejestrów (FC 3 / FC 4) i kwarantanna martwych adresów."""
+from __future__ import annotations
+
+import logging
+import time
+from typing import AbstractSet, Any, Dict, Iterable, Set
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, QUARANTINE_PROBE_INTERVAL
+from .planner import register_kind
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 30  # seconds
+
+
+def _store(hass: HomeAssistant, entry_id: str) -> Store:
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.register_map")
+
+
+async def async_remove_register_map(hass: HomeAssistant, entry_id: str) -> None:
+    """Usuń zapisaną mapę po usunięciu wpisu konfiguracyjnego."""
+    await _store(hass, entry_id).async_remove()
+
+
+class RegisterKindMap:
+    """Per-wpis wiedza o tym, który typ rejestru odpowiada pod danym adresem.
+
+    Adres, który odpowiedział, ma zapamiętany typ (holding | input) – kolejne cykle
+    pytają tylko o niego, bez fallbacku. Adres, dla którego urządzenie odrzuca oba
+    typy (wyjątek 1/2 – nieznana funkcja lub adres), trafia do kwarantanny i jest sprawdzany ponownie co
+    ``probe_interval`` sekund. Nieużywane adresy, przez które blok był odrzucany
+    (luki), nie są więcej obejmowane blokiem danego typu. Stan jest zapisywany
+    w magazynie HA.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant | None,
+        entry_id: str | None,
+        probe_interval: float = QUARANTINE_PROBE_INTERVAL,
+    ) -> None:
+        self._store: Store | None = _store(hass, entry_id) if hass and entry_id else None
+        self._probe_interval = probe_interval
+        self._kinds: Dict[int, str] = {}
+        # adres -> czas (epoch) następnej próby
+        self._quarantine: Dict[int, float] = {}
+        # typ rejestru -> adresy spoza definicji, przez które blok był odrzucany
+        self._gaps: Dict[str, Set[int]] = {}
+        # adres -> kolejne cykle z odrzuceniem adresu (tylko w pamięci)
+        self._strikes: Dict[int, int] = {}
+        # rośnie przy każdej zmianie wpływającej na plan odczytu
+        self.version = 0
+
+    async def async_load(self) -> None:
+        if self._store is None:
+            return
+        data = await self._store.async_load() or {}
+        self._kinds = {
+            int(a): k for a, k in data.get("kinds", {}).items() if k in ("holding", "input")
+        }
+        self._quarantine = {int(a): float(t) for a, t in data.get("quarantine", {}).items()}
+        self._gaps = {
+            k: {int(a) for a in addrs} for k, addrs in data.get("gaps", {}).items() if k in ("holding", "input")
+        }
+        self.version += 1
+        _LOGGER.debug(
+            "EnsolarX: wczytano mapę rejestrów (%s znanych, %s w kwarantannie)",
+            len(self._kinds), len(self._quarantine),
+        )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._data_to_save()
+
+    def _data_to_save(self) -> Dict[str, Any]:
+        return {
+            "kinds": {str(a): k for a, k in sorted(self._kinds.items())},
+            "quarantine": {str(a): t for a, t in sorted(self._quarantine.items())},
+            "gaps": {k: sorted(addrs) for k, addrs in sorted(self._gaps.items())},
+        }
+
+    def _changed(self) -> None:
+        self.version += 1
+        if self._store is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def known(self, addr: int) -> bool:
+        return addr in self._kinds
+
+    def kind_for(self, d: Dict[str, Any]) -> str:
+        """Nauczony typ rejestru albo deklarowany w definicji."""
+        return self._kinds.get(int(d["address"]), register_kind(d))
+
+    def barriers(self, kind: str) -> AbstractSet[int]:
+        """Adresy, których blok danego typu nie powinien obejmować."""
+        return (
+            {a for a, k in self._kinds.items() if k != kind}
+            | self._quarantine.keys()
+            | self._gaps.get(kind, set())
+        )
+
+    def learn_gap(self, kind: str, addrs: Iterable[int]) -> None:
+        """Zapamiętaj luki, przez które blok ``kind`` był odrzucany, a pojedyncze odczyty nie."""
+        gaps = self._gaps.setdefault(kind, set())
+        new = set(addrs) - gaps
+        if new:
+            _LOGGER.info(
+                "EnsolarX: %s %s odrzucane w bloku – plan odczytu nie będzie ich obejmował",
+                kind, ", ".join(str(a) for a in sorted(new)),
+            )
+            gaps.update(new)
+            self._changed()
+
+    def strike(self, addr: int) -> int:
+        """Zapisz kolejny cykl, w którym urządzenie odrzuciło adres; zwraca ich liczbę."""
+        self._strikes[addr] = self._strikes.get(addr, 0) + 1
+        return self._strikes[addr]
+
+    def strikes(self, addr: int) -> int:
+        return self._strikes.get(addr, 0)
+
+    def learn(self, addr: int, kind: str) -> None:
+        self._strikes.pop(addr, None)
+        released = self._quarantine.pop(addr, None) is not None
+        if released:
+            _LOGGER.info("EnsolarX: adres %s znów odpowiada (%s), koniec kwarantanny", addr, kind)
+        if released or self._kinds.get(addr) != kind:
+            self._kinds[addr] = kind
+            self._changed()
+
+    def quarantine(self, addr: int) -> None:
+        if addr not in self._quarantine:
+            _LOGGER.warning(
+                "EnsolarX: adres %s nie odpowiada dla żadnego typu rejestru – kwarantanna (ponowna próba co %ss)",
+                addr, int(self._probe_interval),
+            )
+        self._kinds.pop(addr, None)
+        self._strikes.pop(addr, None)
+        self._quarantine[addr] = time.time() + self._probe_interval
+        self._changed()
+
+    @property
+    def has_quarantine(self) -> bool:
+        return bool(self._quarantine)
+
+    def quarantined(self, addr: int) -> bool:
+        return addr in self._quarantine
+
+    def probe_due(self, addr: int) -> bool:
+        """True, jeśli adres jest w kwarantannie i nadszedł czas ponownej próby."""
+        next_probe = self._quarantine.get(addr)
+        return next_probe is not None and time.time() >= next_probe
@@ -0,0 +1,92 @@
+"""Adaptacyjny interwał odpytywania EnsolarX."""
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Tuple
+
+from .const import TIER_MEDIUM, TIER_SLOW
+
+_LOGGER = logging.getLogger(__name__)
+
+# kolejność odkładania klas przy przeciążeniu: najpierw wolna, potem średnia
+SHED_ORDER: Tuple[str, ...] = (TIER_SLOW, TIER_MEDIUM)
+# odłożona klasa jest odczytywana najpóźniej po tylu swoich interwałach
+SHED_MAX_DELAY = 3.0
+
+
+class AdaptiveScheduler:
+    """Dopasowuje interwał klasy ``fast`` do rzeczywistego czasu cyklu.
+
+    Czas cyklu jest wygładzany (EWMA). Gdy z zapasem ``headroom`` przekracza
+    interwał bazowy, najpierw odkładane są klasy o niższym priorytecie (``slow``,
+    potem ``medium``), a dopiero potem interwał jest wydłużany – maks. do
+    ``max_interval``. Po ustąpieniu przeciążenia interwał wraca stopniowo do
+    bazowego, a odłożone klasy – z histerezą. ``achieved_interval`` to
+    wygładzony odstęp między startami kolejnych cykli.
+    """
+
+    def __init__(
+        self,
+        base_interval: float,
+        max_interval: float,
+        headroom: float = 1.25,
+        alpha: float = 0.3,
+    ) -> None:
+        self.base_interval = float(base_interval)
+        self.max_interval = max(self.base_interval, float(max_interval))
+        self.headroom = headroom
+        self.alpha = alpha
+        self.interval = self.base_interval
+        self.shed = 0  # liczba odłożonych klas z SHED_ORDER
+        self.cycle_time: float | None = None
+        self.achieved_interval: float | None = None
+        self._last_start: float | None = None
+
+    @property
+    def shed_tiers(self) -> Tuple[str, ...]:
+        return SHED_ORDER[:self.shed]
+
+    def record(self, started: float, duration: float) -> float:
+        """Uwzględnij zakończony cykl; zwraca interwał do następnego cyklu."""
+        a = self.alpha
+        self.cycle_time = duration if self.cycle_time is None else a * duration + (1 - a) * self.cycle_time
+        if self._last_start is not None:
+            period = started - self._last_start
+            self.achieved_interval = (
+                period if self.achieved_interval is None
+                else a * period + (1 - a) * self.achieved_interval
+            )
+        self._last_start = started
+
+        needed = self.cycle_time * self.headroom
+        if needed > self.base_interval and self.shed < len(SHED_ORDER):
+            self.shed += 1
+            _LOGGER.info(
+                "EnsolarX: cykl %.1fs przy interwale %.0fs – odkładam klasę %s",
+                self.cycle_time, self.base_interval, SHED_ORDER[self.shed - 1],
+            )
+        elif needed < self.base_interval * 0.6 and self.shed:
+            self.shed -= 1
+            _LOGGER.info("EnsolarX: przeciążenie ustąpiło – przywracam klasę %s", SHED_ORDER[self.shed])
+
+        if self.shed < len(SHED_ORDER) and needed > self.base_interval:
+            needed = self.base_interval  # najpierw odkładanie klas, potem wydłużanie
+        target = min(self.max_interval, max(self.base_interval, needed))
+        if target >= self.interval:
+            self.interval = target
+        else:
+            # skracanie stopniowe – bez oscylacji przy zaszumionym łączu
+            self.interval = max(target, self.interval * 0.8)
+        return self.interval
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "base_interval": self.base_interval,
+            "max_interval": self.max_interval,
+            "interval": round(self.interval, 2),
+            "cycle_time": round(self.cycle_time, 3) if self.cycle_time is not None else None,
+            "achieved_interval": (
+                round(self.achieved_interval, 2) if self.achieved_interval is not None else None
+            ),
+            "shed_tiers": list(self.shed_tiers),
+        }
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List
+
+from homeassistant.components.select import SelectEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .entity import EnsolarXSettingEntity
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    data = hass.data[DOMAIN][entry.entry_id]
+    coordinator = data["coordinator"]
+    entities: List[EnsolarXSelect] = [
+        EnsolarXSelect(coordinator, data["writer"], d, entry.entry_id)
+        for d in coordinator.defs
+        if d.get("writable") == "select"
+    ]
+    async_add_entities(entities)
+
+
+class EnsolarXSelect(EnsolarXSettingEntity, SelectEntity):
+    """Ustawienie wyliczeniowe; opcje to surowe kody rejestru z definicji."""
+
+    _attr_entity_category = EntityCategory.CONFIG
+
+    def __init__(self, coordinator, writer, d: Dict[str, Any], entry_id: str) -> None:
+        super().__init__(coordinator, writer, d, entry_id)
+        self._attr_options = [str(code) for code in d.get("options", [])]
+
+    @property
+    def current_option(self) -> str | None:
+        value = self._value
+        if value is None:
+            return None
+        option = str(int(value))
+        return option if option in self._attr_options else None
+
+    async def async_select_option(self, option: str) -> None:
+        await self._async_write(int(option))
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass, fields as dc_fields
-from typing import Any, Optional, List
+from typing import Any, Callable, Optional, List
 
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN, SENSOR_DEFS
+from .aggregation import DerivedSensor
+from .const import CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL, DOMAIN, UNIT_DEVICE_CLASSES
 from .coordinator import EnsolarXCoordinator
+from .entity import device_info
 
 
 @dataclass
@@ -25,6 +28,67 @@ class EnsolarXSensorDesc:
     input_type: str = "holding"
     word_swap: bool = False
     fallback: bool = True
+    deadband: float = 0.0
+    deadband_rel: float = 0.0
+
+
+@dataclass
+class EnsolarXDiagnosticDesc:
+    key: str
+    name: str
+    value: Callable[[EnsolarXCoordinator], Any]
+    unit: Optional[str] = None
+    state_class: SensorStateClass = SensorStateClass.MEASUREMENT
+    enabled_default: bool = False
+
+
+def _client_counter(attr: str) -> Callable[[EnsolarXCoordinator], Any]:
+    return lambda c: getattr(c.client, attr, None)
+
+
+DIAGNOSTIC_SENSORS: List[EnsolarXDiagnosticDesc] = [
+    EnsolarXDiagnosticDesc(
+        "cycle_duration", "Czas cyklu odczytu",
+        lambda c: c.metrics.last_cycle.get("duration_ms"), UnitOfTime.MILLISECONDS,
+    ),
+    EnsolarXDiagnosticDesc(
+        "achieved_interval", "Osiągnięty interwał odświeżania",
+        lambda c: None if c.scheduler.achieved_interval is None else round(c.scheduler.achieved_interval, 1),
+        UnitOfTime.SECONDS,
+    ),
+    EnsolarXDiagnosticDesc(
+        "shed_tiers", "Odłożone klasy odpytywania", lambda c: len(c.scheduler.shed_tiers),
+    ),
+    EnsolarXDiagnosticDesc(
+        "cycle_requests", "Zapytania w cyklu", lambda c: c.metrics.last_cycle.get("requests"),
+    ),
+    EnsolarXDiagnosticDesc(
+        "cycle_bytes", "Bajty w cyklu", lambda c: c.metrics.last_cycle.get("bytes"), UnitOfInformation.BYTES,
+    ),
+    EnsolarXDiagnosticDesc(
+        "latency_p95", "Opóźnienie zapytań p95", lambda c: c.metrics.latency.percentile(95), UnitOfTime.MILLISECONDS,
+    ),
+    EnsolarXDiagnosticDesc(
+        "overruns", "Cykle dłuższe niż interwał", lambda c: c.metrics.overruns,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    EnsolarXDiagnosticDesc(
+        "retries", "Ponowienia zapytań", lambda c: c.metrics.retries,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    EnsolarXDiagnosticDesc(
+        "fallbacks", "Odczyty awaryjne (drugi typ rejestru)", lambda c: c.metrics.fallbacks,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    EnsolarXDiagnosticDesc(
+        "stale_frames", "Odrzucone ramki (TID)", _client_counter("stale_frames"),
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+    EnsolarXDiagnosticDesc(
+        "reconnects", "Ponowne połączenia", _client_counter("reconnects"),
+        state_class=SensorStateClass.TOTAL_INCREASING,
+    ),
+]
 
 
 async def async_setup_entry(
@@ -34,42 +98,183 @@ async def async_setup_entry(
 ) -> None:
     data = hass.data[DOMAIN][entry.entry_id]
     coordinator: EnsolarXCoordinator = data["coordinator"]
+    heartbeat = entry.data.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL)
 
     allowed = {f.name for f in dc_fields(EnsolarXSensorDesc)}
-    entities: List[EnsolarXSensorEntity] = [
+    entities: List[SensorEntity] = [
         EnsolarXSensorEntity(
             coordinator,
             EnsolarXSensorDesc(**{k: v for k, v in s.items() if k in allowed}),
             entry.entry_id,
+            heartbeat,
         )
-        for s in SENSOR_DEFS
+        for s in coordinator.defs
     ]
+    entities.extend(
+        EnsolarXDerivedSensor(coordinator, derived, entry.entry_id, heartbeat)
+        for derived in (*coordinator.derived.sensors, *coordinator.aggregator.sensors)
+    )
+    entities.extend(
+        EnsolarXDiagnosticSensor(coordinator, desc, entry.entry_id) for desc in DIAGNOSTIC_SENSORS
+    )
 
     async_add_entities(entities)
 
 
 class EnsolarXSensorEntity(CoordinatorEntity[EnsolarXCoordinator], SensorEntity):
+    """Sensor rejestru EnsolarX zapisujący stan tylko po przekroczeniu martwej strefy."""
+
     _attr_has_entity_name = True
 
-    def __init__(self, coordinator: EnsolarXCoordinator, desc: EnsolarXSensorDesc, entry_id: str) -> None:
+    def __init__(
+        self,
+        coordinator: EnsolarXCoordinator,
+        desc: EnsolarXSensorDesc,
+        entry_id: str,
+        heartbeat: float = DEFAULT_HEARTBEAT_INTERVAL,
+    ) -> None:
         super().__init__(coordinator)
         self._desc = desc
+        self._heartbeat = heartbeat
+        # ostatnio zapisany stan – punkt odniesienia dla martwej strefy
+        self._written_value: Any = None
+        self._written_available: bool | None = None
+        self._written_at = 0.0
         self._attr_unique_id = f"{entry_id}_{desc.address}"
         self._attr_name = desc.name
         self._attr_native_unit_of_measurement = desc.unit
         if desc.precision is not None:
             self._attr_suggested_display_precision = desc.precision
+        if desc.unit:
+            # statystyki długoterminowe HA; liczniki Wh zerowane o północy to total_increasing
+            self._attr_device_class = UNIT_DEVICE_CLASSES.get(desc.unit)
+            self._attr_state_class = (
+                SensorStateClass.TOTAL_INCREASING if desc.unit in ("Wh", "kWh") else SensorStateClass.MEASUREMENT
+            )
+
+        self._attr_device_info = device_info(entry_id)
+
+    @property
+    def native_value(self) -> Any:
+        return (self.coordinator.data or {}).get(self._desc.name)
+
+    @property
+    def available(self) -> bool:
+        if self.coordinator.stale_after:
+            # wartość (także z migawki po restarcie) ważna, dopóki nie jest za stara –
+            # pojedyncze nieudane cykle nie wyłączają encji
+            return self.native_value is not None and not self.coordinator.is_stale(self._desc.name)
+        return super().available
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._mark_written()
+
+    def _mark_written(self) -> None:
+        self._written_value = self.native_value
+        self._written_available = self.available
+        self._written_at = time.monotonic()
+
+    def _crossed_deadband(self, value: Any) -> bool:
+        old = self._written_value
+        if value == old:
+            return False
+        if not isinstance(value, (int, float)) or not isinstance(old, (int, float)):
+            return True
+        threshold = max(self._desc.deadband, abs(old) * self._desc.deadband_rel)
+        return abs(value - old) >= threshold
 
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, entry_id)},
-            name="EnsolarX",
-            manufacturer="Endimac",
-            model="EnsolarX",
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Zapisz stan tylko przy zmianie ponad martwą strefę, dostępności lub heartbeat."""
+        if (
+            self.available != self._written_available
+            or self._crossed_deadband(self.native_value)
+            or time.monotonic() - self._written_at >= self._heartbeat
+        ):
+            self._mark_written()
+            self.async_write_ha_state()
+
+
+class EnsolarXDerivedSensor(EnsolarXSensorEntity):
+    """Wielkość wyliczana w koordynatorze (wielkości pochodne, energia, sumy, okna 5 min)."""
+
+    def __init__(
+        self,
+        coordinator: EnsolarXCoordinator,
+        derived: DerivedSensor,
+        entry_id: str,
+        heartbeat: float = DEFAULT_HEARTBEAT_INTERVAL,
+    ) -> None:
+        # energia zapisywana co 10 Wh – nie przy każdym cyklu
+        deadband = 0.01 if derived.unit == "kWh" else derived.deadband
+        desc = EnsolarXSensorDesc(
+            name=derived.name, address=-1, unit=derived.unit,
+            deadband=deadband, deadband_rel=derived.deadband_rel,
         )
+        super().__init__(coordinator, desc, entry_id, heartbeat)
+        self._derived = derived
+        self._attr_unique_id = f"{entry_id}_{derived.kind}_{derived.name}"
+        if derived.kind == "metric":
+            self._attr_device_class = UNIT_DEVICE_CLASSES.get(derived.unit)
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        elif derived.kind == "window":
+            self._attr_device_class = SensorDeviceClass.POWER
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        else:
+            self._attr_device_class = SensorDeviceClass.ENERGY
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+        if derived.precision is not None:
+            self._attr_suggested_display_precision = derived.precision
+        else:
+            self._attr_suggested_display_precision = 2 if derived.unit == "kWh" else 0
+
+    @property
+    def available(self) -> bool:
+        if self._derived.kind == "metric" and self.coordinator.stale_after:
+            # wielkość pochodna jest tak świeża jak najstarszy rejestr źródłowy
+            sources = self.coordinator.derived.sources.get(self._derived.name, ())
+            return self.native_value is not None and not any(self.coordinator.is_stale(s) for s in sources)
+        return super().available
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        if self._derived.kind == "metric":
+            return self.coordinator.derived.attributes(self._derived.name)
+        if self._derived.kind != "window":
+            return None
+        stats = self.coordinator.aggregator.window_stats(self._derived.name)
+        if stats is None:
+            return None
+        return {
+            "min": stats.min,
+            "max": stats.max,
+            "samples": stats.samples,
+            "window_start": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(stats.start)),
+        }
+
+
+class EnsolarXDiagnosticSensor(CoordinatorEntity[EnsolarXCoordinator], SensorEntity):
+    """Licznik instrumentacji koordynatora (czas cyklu, zapytania, błędy)."""
+
+    _attr_has_entity_name = True
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator: EnsolarXCoordinator, desc: EnsolarXDiagnosticDesc, entry_id: str) -> None:
+        super().__init__(coordinator)
+        self._desc = desc
+        self._attr_unique_id = f"{entry_id}_diag_{desc.key}"
+        self._attr_name = desc.name
+        self._attr_native_unit_of_measurement = desc.unit
+        self._attr_state_class = desc.state_class
+        self._attr_entity_registry_enabled_default = desc.enabled_default
+        self._attr_device_info = device_info(entry_id)
+
+    @property
+    def available(self) -> bool:
+        # liczniki mają sens także wtedy, gdy urządzenie nie odpowiada
+        return True
 
     @property
     def native_value(self) -> Any:
-        data = self.coordinator.data or {}
-        if self._desc.name in data:
-            return data[self._desc.name]
-        return data.get(str(self._desc.address))
+        return self._desc.value(self.coordinator)
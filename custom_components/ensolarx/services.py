@@ -0,0 +1,227 @@
+"""Usługi integracji EnsolarX."""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from contextlib import ExitStack
+from typing import Any, Dict
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+import homeassistant.helpers.config_validation as cv
+
+from .capture import (
+    CAPTURE_PRESETS,
+    EVENT_CAPTURE_FINISHED,
+    MAX_CAPTURE_DURATION,
+    MIN_CAPTURE_INTERVAL,
+    async_capture,
+    select_defs,
+)
+from .const import DOMAIN, MODBUS_MAX_READ_REGISTERS
+from .discovery import (
+    EVENT_DISCOVERY_FINISHED,
+    MAX_DISCOVERY_SPAN,
+    REGISTER_KINDS,
+    async_discover,
+)
+from .modbus_client import CircuitOpenError
+from .profiles import USER_PROFILES_DIR
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_CAPTURE = "capture"
+SERVICE_DISCOVER = "discover"
+
+ATTR_ENTRY_ID = "entry_id"
+ATTR_PRESET = "preset"
+ATTR_START = "start"
+ATTR_COUNT = "count"
+ATTR_INTERVAL = "interval"
+ATTR_DURATION = "duration"
+ATTR_EXPORT = "export"
+ATTR_FUNCTION = "function"
+ATTR_BLOCK_SIZE = "block_size"
+
+CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Exclusive(ATTR_PRESET, "registers"): vol.In(list(CAPTURE_PRESETS)),
+        vol.Exclusive(ATTR_START, "registers"): vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF)),
+        vol.Optional(ATTR_COUNT, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MODBUS_MAX_READ_REGISTERS)
+        ),
+        vol.Optional(ATTR_INTERVAL, default=0.25): vol.All(
+            vol.Coerce(float), vol.Range(min=MIN_CAPTURE_INTERVAL, max=5)
+        ),
+        vol.Optional(ATTR_DURATION, default=60): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=MAX_CAPTURE_DURATION)
+        ),
+        vol.Optional(ATTR_EXPORT, default=True): cv.boolean,
+    }
+)
+
+DISCOVER_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_START, default=0): vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF)),
+        vol.Optional(ATTR_COUNT, default=200): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_DISCOVERY_SPAN)
+        ),
+        vol.Optional(ATTR_FUNCTION, default="both"): vol.In(["both", *REGISTER_KINDS]),
+        vol.Optional(ATTR_BLOCK_SIZE, default=MODBUS_MAX_READ_REGISTERS): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MODBUS_MAX_READ_REGISTERS)
+        ),
+        vol.Optional(ATTR_EXPORT, default=True): cv.boolean,
+    }
+)
+
+
+def _entry_data(hass: HomeAssistant, entry_id: str | None) -> Dict[str, Any]:
+    entries = {k: v for k, v in hass.data.get(DOMAIN, {}).items() if isinstance(v, dict) and "coordinator" in v}
+    if entry_id is None:
+        if len(entries) != 1:
+            raise ServiceValidationError("EnsolarX: podaj entry_id (skonfigurowano kilka urządzeń)")
+        return next(iter(entries.values()))
+    if entry_id not in entries:
+        raise ServiceValidationError(f"EnsolarX: nieznany wpis {entry_id}")
+    return entries[entry_id]
+
+
+async def _async_capture(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    data = _entry_data(hass, call.data.get(ATTR_ENTRY_ID))
+    coordinator = data["coordinator"]
+    if coordinator.polling_paused:
+        raise ServiceValidationError("EnsolarX: przechwytywanie już trwa dla tego urządzenia")
+
+    if ATTR_START in call.data:
+        first = call.data[ATTR_START]
+        last = first + call.data[ATTR_COUNT] - 1
+    else:
+        first, last = CAPTURE_PRESETS[call.data.get(ATTR_PRESET, "cells")]
+    defs = select_defs(coordinator.defs, first, last)
+    if not defs:
+        raise ServiceValidationError(f"EnsolarX: brak zdefiniowanych rejestrów w zakresie {first}-{last}")
+
+    prefix = None
+    if call.data[ATTR_EXPORT]:
+        unit_id = getattr(coordinator.client, "unit_id", "x")
+        prefix = os.path.join(
+            hass.config.path(f"{DOMAIN}_captures"),
+            time.strftime(f"capture_{unit_id}_{first}-{last}_%Y%m%d_%H%M%S"),
+        )
+
+    async def run() -> Dict[str, Any]:
+        with busy:
+            summary = await capture()
+        # po wznowieniu odpytywania – inaczej odświeżenie zwróciłoby zachowane dane
+        await coordinator.async_request_refresh()
+        return summary
+
+    async def capture() -> Dict[str, Any]:
+        try:
+            result = await async_capture(
+                hass, coordinator, defs, call.data[ATTR_INTERVAL], call.data[ATTR_DURATION], prefix
+            )
+        except Exception as err:
+            raise HomeAssistantError(f"EnsolarX: przechwytywanie nieudane: {err}") from err
+        summary = result.as_dict()
+        _LOGGER.info(
+            "EnsolarX: przechwytywanie zakończone – %s próbek (%s Hz), błędów %s, pominiętych %s, plik %s",
+            summary["samples"], summary["rate_hz"], summary["errors"], summary["overruns"],
+            summary["csv_path"] or "-",
+        )
+        hass.bus.async_fire(EVENT_CAPTURE_FINISHED, summary)
+        return summary
+
+    # zajęte od razu – drugie wywołanie przed startem zadania w tle zostanie odrzucone
+    busy = ExitStack()
+    busy.enter_context(coordinator.pause_polling())
+    if call.return_response:
+        return await run()
+    # bez oczekiwania na wynik – przechwytywanie w tle, wynik w zdarzeniu
+    hass.async_create_background_task(run(), f"{DOMAIN}_capture")
+    return None
+
+
+async def _async_discover(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    data = _entry_data(hass, call.data.get(ATTR_ENTRY_ID))
+    coordinator = data["coordinator"]
+    if coordinator.polling_paused:
+        raise ServiceValidationError("EnsolarX: urządzenie jest zajęte (przechwytywanie lub wykrywanie)")
+
+    first = call.data[ATTR_START]
+    last = min(0xFFFF, first + call.data[ATTR_COUNT] - 1)
+    function = call.data[ATTR_FUNCTION]
+    kinds = REGISTER_KINDS if function == "both" else (function,)
+
+    prefix = None
+    if call.data[ATTR_EXPORT]:
+        unit_id = getattr(coordinator.client, "unit_id", "x")
+        # plik trafia do katalogu profili użytkownika – od razu do wyboru w opcjach wpisu
+        prefix = os.path.join(
+            hass.config.path(USER_PROFILES_DIR),
+            time.strftime(f"discovered_{unit_id}_{first}-{last}_%Y%m%d_%H%M%S"),
+        )
+
+    async def run() -> Dict[str, Any]:
+        with busy:
+            summary = await discover()
+        # po wznowieniu odpytywania – inaczej odświeżenie zwróciłoby zachowane dane
+        await coordinator.async_request_refresh()
+        return summary
+
+    async def discover() -> Dict[str, Any]:
+        try:
+            result = await async_discover(
+                hass, coordinator, first, last, kinds, call.data[ATTR_BLOCK_SIZE], prefix
+            )
+        except CircuitOpenError as err:
+            raise HomeAssistantError(f"EnsolarX: urządzenie niedostępne: {err}") from err
+        except Exception as err:
+            raise HomeAssistantError(f"EnsolarX: wykrywanie nieudane: {err}") from err
+        summary = result.as_dict()
+        _LOGGER.info(
+            "EnsolarX: wykrywanie %s-%s zakończone – %s zapytań w %ss, czytelne: %s, bez odpowiedzi: %s, profil %s",
+            first, last, summary["requests"], summary["duration"], summary["ranges"],
+            summary["unanswered"] or "-", summary["profile_path"] or "-",
+        )
+        hass.bus.async_fire(EVENT_DISCOVERY_FINISHED, summary)
+        return summary
+
+    busy = ExitStack()
+    busy.enter_context(coordinator.pause_polling())
+    if call.return_response:
+        return await run()
+    hass.async_create_background_task(run(), f"{DOMAIN}_discover")
+    return None
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    if hass.services.has_service(DOMAIN, SERVICE_CAPTURE):
+        return
+
+    async def handle_capture(call: ServiceCall) -> ServiceResponse:
+        return await _async_capture(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CAPTURE,
+        handle_capture,
+        schema=CAPTURE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+    async def handle_discover(call: ServiceCall) -> ServiceResponse:
+        return await _async_discover(hass, call)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DISCOVER,
+        handle_discover,
+        schema=DISCOVER_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
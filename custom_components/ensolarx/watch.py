@@ -0,0 +1,145 @@
+"""Szybka pętla obserwacji rejestrów statusu (``watch`` w profilu).
+
+Mały blok rejestrów statusu (falownik, BMS, MOSFETy) jest czytany co
+``watch_interval`` sekund niezależnie od cyklu odpytywania. Zmiana wartości
+wywołuje zdarzenie ``ensolarx_status_changed`` i natychmiastowy odczyt grup
+wskazanych w ``refresh`` rejestru (np. prądy baterii, napięcia celi); pełna
+mapa jest dalej odpytywana według klas.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .decoder import BlockDecoder
+from .planner import ReadBlock
+
+_LOGGER = logging.getLogger(__name__)
+
+EVENT_STATUS_CHANGED = f"{DOMAIN}_status_changed"
+
+
+class StatusWatcher:
+    """Pętla obserwacji jednego wpisu; uruchamiana jako zadanie w tle wpisu."""
+
+    def __init__(self, hass: HomeAssistant, coordinator, entry_id: str | None, interval: float) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._entry_id = entry_id
+        self.interval = float(interval)
+        defs = coordinator.defs
+        self._watched = [d for d in defs if d.get("watch")]
+        # nazwa rejestru statusu -> definicje z grup odświeżanych po jego zmianie
+        self._refresh: Dict[str, List[Dict[str, Any]]] = {
+            w["name"]: [d for d in defs if d.get("group") in w.get("refresh", ()) and not d.get("watch")]
+            for w in self._watched
+        }
+        self._plan: List[Tuple[ReadBlock, BlockDecoder]] = []
+        self._plan_version: int | None = None
+        self._last: Dict[str, Any] = {}
+        self.reads = 0
+        self.errors = 0
+        self.changes = 0
+        self.refreshes = 0
+        self.last_change: Dict[str, Any] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0 and bool(self._watched)
+
+    def _watch_plan(self) -> List[Tuple[ReadBlock, BlockDecoder]]:
+        """Plan odczytu rejestrów statusu – przeliczany po zmianie nauczonej mapy typów."""
+        version = self._coordinator.register_map.version
+        if self._plan_version != version:
+            self._plan = self._coordinator.plan_for(self._watched)
+            self._plan_version = version
+        return self._plan
+
+    def _idle(self) -> bool:
+        c = self._coordinator
+        # blokada zajęta – trwa cykl odpytywania lub zapis; cykl i tak odświeży dane
+        return c.polling_paused or c.lock.locked() or bool(getattr(c.client, "circuit_open", False))
+
+    async def async_run(self) -> None:
+        _LOGGER.debug(
+            "EnsolarX: obserwacja %s co %ss",
+            ", ".join(str(d["address"]) for d in self._watched), self.interval,
+        )
+        while True:
+            await asyncio.sleep(self.interval)
+            if self._idle():
+                continue
+            try:
+                await self.async_check()
+            except Exception as err:
+                self.errors += 1
+                _LOGGER.debug("EnsolarX: odczyt obserwowanych rejestrów nieudany: %s", err)
+
+    async def async_check(self) -> None:
+        """Jeden odczyt rejestrów statusu; przy zmianie – zdarzenie i odczyt powiązanych grup."""
+        c = self._coordinator
+        async with c.lock:
+            values = await self._async_read_changes()
+        if values is not None:
+            c.publish(values)
+
+    async def _async_read_changes(self) -> Dict[str, Any] | None:
+        """Odczyty pod blokadą wpisu (bez przeplatania z cyklem i odczytem zwrotnym zapisów).
+
+        Zwraca wartości do publikacji albo None, gdy żaden status się nie zmienił.
+        """
+        c = self._coordinator
+        values = await c.async_read_plan(self._watch_plan())
+        self.reads += 1
+        changed = [
+            d for d in self._watched
+            if d["name"] in values and d["name"] in self._last and values[d["name"]] != self._last[d["name"]]
+        ]
+        previous = self._last
+        self._last = {**previous, **values}
+        if not changed:
+            return None
+
+        refresh: Dict[str, Dict[str, Any]] = {}
+        for d in changed:
+            self.changes += 1
+            self.last_change = {
+                "name": d["name"],
+                "address": d["address"],
+                "old": previous[d["name"]],
+                "new": values[d["name"]],
+                "at": time.time(),
+            }
+            _LOGGER.info(
+                "EnsolarX: %s (adres %s) zmiana %s -> %s",
+                d["name"], d["address"], previous[d["name"]], values[d["name"]],
+            )
+            self._hass.bus.async_fire(
+                EVENT_STATUS_CHANGED,
+                {"entry_id": self._entry_id, **{k: v for k, v in self.last_change.items() if k != "at"}},
+            )
+            for r in self._refresh.get(d["name"], ()):
+                refresh[r["name"]] = r
+
+        if refresh:
+            self.refreshes += 1
+            values.update(await c.async_read_plan(c.plan_for(list(refresh.values()))))
+        return values
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "watched": [d["address"] for d in self._watched],
+            "refresh": {n: len(r) for n, r in self._refresh.items()},
+            "plan": [str(b) for b, _ in self._plan],
+            "reads": self.reads,
+            "errors": self.errors,
+            "changes": self.changes,
+            "refreshes": self.refreshes,
+            "last_change": self.last_change,
+        }
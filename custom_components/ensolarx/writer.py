@@ -0,0 +1,134 @@
+"""Kolejka zapisów rejestrów holding EnsolarX (FC 6 / FC 16) z weryfikacją odczytem."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, WRITE_BATCH_DELAY
+from .modbus_client import MAX_WRITE_REGISTERS, ModbusError
+from .planner import data_type, register_count
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def encode_value(d: Dict[str, Any], value: float) -> int:
+    """Wartość w jednostce sensora -> surowy rejestr (odwrotność skali)."""
+    if register_count(d) != 1:
+        raise ValueError(f"{d['name']}: zapis obsługiwany tylko dla rejestrów 16-bitowych")
+    raw = round(float(value) / float(d.get("scale", 1.0)))
+    low, high = (-0x8000, 0x7FFF) if data_type(d) == "int16" else (0, 0xFFFF)
+    if not low <= raw <= high:
+        raise ValueError(f"{d['name']}: wartość {value} poza zakresem rejestru")
+    return raw & 0xFFFF
+
+
+def _runs(pending: Dict[int, int]) -> List[Tuple[int, List[int]]]:
+    """Ciągłe zakresy adresów (start, wartości) – jeden zapis na zakres."""
+    runs: List[Tuple[int, List[int]]] = []
+    for addr in sorted(pending):
+        if runs and runs[-1][0] + len(runs[-1][1]) == addr and len(runs[-1][1]) < MAX_WRITE_REGISTERS:
+            runs[-1][1].append(pending[addr])
+        else:
+            runs.append((addr, [pending[addr]]))
+    return runs
+
+
+class RegisterWriteQueue:
+    """Zapisy zebrane w oknie ``batch_delay`` są wysyłane razem.
+
+    Kolejne zapisy tego samego adresu nadpisują się (wysyłana jest ostatnia
+    wartość), a sąsiednie adresy są łączone w jedno zapytanie FC 16 (pojedynczy
+    adres – FC 6). Zapis odbywa się pod blokadą wpisu, więc nie przeplata się z
+    cyklem odpytywania; każdy zakres jest potem odczytywany i porównywany, a
+    odczytane wartości trafiają od razu do danych koordynatora. Zadanie zapisu jest
+    zadaniem w tle wpisu; przy wyładowaniu wpisu ``async_shutdown`` dokańcza
+    oczekujące zapisy przed zwolnieniem połączenia.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator,
+        lock: asyncio.Lock,
+        batch_delay: float = WRITE_BATCH_DELAY,
+    ) -> None:
+        self._hass = hass
+        self._entry = entry
+        self._coordinator = coordinator
+        self._lock = lock
+        self._batch_delay = batch_delay
+        # adres -> (surowa wartość, oczekujący)
+        self._pending: Dict[int, Tuple[int, List[asyncio.Future]]] = {}
+        self._flush: asyncio.Task | None = None
+        self._closed = False
+
+    async def async_write_value(self, d: Dict[str, Any], value: float) -> None:
+        await self.async_write(int(d["address"]), encode_value(d, value))
+
+    async def async_write(self, address: int, raw: int) -> None:
+        if self._closed:
+            raise RuntimeError("wpis jest wyładowywany")
+        fut = asyncio.get_running_loop().create_future()
+        waiters = self._pending[address][1] if address in self._pending else []
+        waiters.append(fut)
+        self._pending[address] = (raw & 0xFFFF, waiters)
+        if self._flush is None:
+            self._flush = self._entry.async_create_background_task(
+                self._hass, self._async_flush(), f"{DOMAIN}_write_{self._entry.entry_id}"
+            )
+        await fut
+
+    async def async_shutdown(self) -> None:
+        """Odrzuć nowe zapisy i dokończ oczekujące (przed zwolnieniem klienta)."""
+        self._closed = True
+        flush = self._flush
+        if flush is not None:
+            await flush
+
+    async def _async_flush(self) -> None:
+        await asyncio.sleep(self._batch_delay)
+        pending, self._pending = self._pending, {}
+        self._flush = None
+        written: Dict[int, int] = {}
+        async with self._lock:
+            for start, values in _runs({a: raw for a, (raw, _) in pending.items()}):
+                try:
+                    written.update(await self._write_run(start, values))
+                    err: Exception | None = None
+                except Exception as e:
+                    err = e
+                    _LOGGER.warning(
+                        "EnsolarX: zapis rejestrów %s-%s nieudany: %s", start, start + len(values) - 1, e
+                    )
+                for addr in range(start, start + len(values)):
+                    for fut in pending[addr][1]:
+                        if fut.done():
+                            continue
+                        if err is None:
+                            fut.set_result(None)
+                        else:
+                            fut.set_exception(err)
+        if written:
+            self._coordinator.apply_registers(written)
+
+    async def _write_run(self, start: int, values: List[int]) -> Dict[int, int]:
+        client = self._coordinator.client
+        if len(values) == 1:
+            await client.write_register(start, values[0])
+        else:
+            await client.write_registers(start, values)
+        readback = await self._coordinator.read_kind("holding", start, len(values))
+        readback = list(readback[:len(values)])
+        _LOGGER.debug("EnsolarX: zapis %s <- %s, odczyt %s", start, values, readback)
+        if readback != values:
+            # urządzenie mogło przyciąć wartość – encje pokazują stan faktyczny
+            self._coordinator.apply_registers(dict(zip(range(start, start + len(values)), readback)))
+            raise ModbusError(
+                f"Weryfikacja zapisu nieudana pod adresem {start}: zapisano {values}, odczytano {readback}"
+            )
+        return dict(zip(range(start, start + len(values)), readback))